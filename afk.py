@@ -1,236 +1,115 @@
 # afk.py - Refactored Version with sv-ttk Theme and UI Polish
 # A tool to automate game actions with a GUI for control.
+# The GUI is a view over core.AntiAfkCore; run core.py for a headless instance.
 
 import tkinter as tk
 from tkinter import messagebox, ttk, font as tkfont
-import time
 import threading
-import keyboard
-import win32gui
-import win32con
-import win32api
-import win32process
-import configparser
+import argparse
 import os
 import sys
-import math
-from PIL import Image, ImageTk
-import pystray
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-# --- NEW IMPORT ---
-import sv_ttk
-# ------------------
+from startup import StartupTimer, lazy_import
+from core import AntiAfkCore
+from targets import Target
 
-try:
-    import vgamepad as vg
-except ImportError:
-    messagebox.showerror("Dependency Missing", "vgamepad library is required. Please install it and the ViGEmBus driver.")
-    sys.exit(1)
+# Heavy modules are imported on first use so the window can show right away
+keyboard = lazy_import('keyboard')
+pystray = lazy_import('pystray')
+Image = lazy_import('PIL.Image')
+ImageTk = lazy_import('PIL.ImageTk')
+sv_ttk = lazy_import('sv_ttk')
 
 class App:
     """Main application class for the Anti-AFK tool."""
     TOOLTIP_BG_COLOR = "#FFFFE0"
 
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, startup: Optional[StartupTimer] = None):
         self.root = root
-        self.gamepad: Optional[vg.VX360Gamepad] = None
-        self.toggle = False
-        self.next_fire = 0.0
+        self.startup = startup or StartupTimer()
+        self.print_startup_report = False
+        self.exit_after_startup = False
         self.is_listening = False
-        self.tray_icon: Optional[pystray.Icon] = None
+        self.tray_icon: Optional["pystray.Icon"] = None
+        self.keybind_buttons = []
+        self.keybind_entries = {} # --- CHANGE: To store entry widgets for dynamic resizing
+        self._countdown_job: Optional[str] = None
         
         self.icon_on_path = self._resource_path("assets/on.ico")
         self.icon_off_path = self._resource_path("assets/off.ico")
+        self._icon_images: Dict[str, Any] = {}  # 'on'/'off' -> decoded PIL image, shared with the tray
+        self._icon_photos: Dict[str, Any] = {}  # 'on'/'off' -> Tk PhotoImage for the window icon
+        self._icon_lock = threading.Lock()
+
+        self.core = AntiAfkCore(startup=self.startup)
+        self.settings, self.hotkeys = self.core.settings, self.core.hotkeys
+        with self.startup.stage('gui'):
+            self._setup_gui()
+            self._update_ui_text()
+            self._refresh_queue(self.core.executor.stats())
+        self.core.subscribe(self._on_core_event)
+        self.core.start()
 
-        self._setup_variables()
-        self._load_config()
-        self._setup_gui()
-        self._update_ui_text()
-        self._setup_vgamepad()
-        self.update_hotkeys()
+        self.root.after_idle(self._deferred_startup)
 
-        threading.Thread(target=self._auto_loop, daemon=True).start()
+    def _deferred_startup(self):
+        """Second startup stage, run once the window is up: hotkeys, tray and gamepad driver."""
+        with self.startup.stage('hotkeys'):
+            self.core.update_hotkeys()
         threading.Thread(target=self._setup_tray_icon, daemon=True).start()
-        self.root.after(200, self._update_gui_loop)
-
-    # --------------------------------------------------------------------------
-    # Setup and Configuration Methods
-    # --------------------------------------------------------------------------
-    def _setup_variables(self):
-        """Initialize default settings and hotkeys."""
-        self.settings = {
-            'interval': 6, 'speed_multiplier': 1.0, 'action_duration': 1.0,
-            'circle_radius': 0.8, 'circle_loops': 1
-        }
-        self.hotkeys = {
-            'toggle_auto': 'f1', 'manual_action': 'f2', 'show_time': 'f3',
-            'set_window': 'f4', 'exit_app': 'ctrl+o'
-        }
-        self.registered_hotkeys = []
-        self.keybind_buttons = []
-        self.keybind_entries = {} # --- CHANGE: To store entry widgets for dynamic resizing
-        
-        self.target_hwnd: Optional[int] = None
-        self.target_title: Optional[str] = None
-        self.target_proc_name: Optional[str] = None
-
-    def _get_config_path(self) -> str:
-        """Get the path for the config file, compatible with PyInstaller."""
-        base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
-        return os.path.join(base_dir, 'options.ini')
-
-    def _load_config(self):
-        """Load configuration from options.ini."""
-        config = configparser.ConfigParser()
-        config_path = self._get_config_path()
-        if not os.path.exists(config_path):
-            self._save_config()
-        
-        config.read(config_path)
-        for key, default in self.settings.items():
-            self.settings[key] = type(default)(config.get('Settings', key, fallback=default))
-        for key, default in self.hotkeys.items():
-            self.hotkeys[key] = config.get('Keybinds', key, fallback=default)
-
-    def _save_config(self):
-        """Save current configuration to options.ini."""
-        config = configparser.ConfigParser()
-        config['Settings'] = {k: str(v) for k, v in self.settings.items()}
-        config['Keybinds'] = self.hotkeys
-        try:
-            with open(self._get_config_path(), 'w') as configfile:
-                config.write(configfile)
-        except Exception as e:
-            self._update_status(f"Error saving config: {e}")
-
-    def _setup_vgamepad(self):
-        """Initializes the virtual gamepad."""
-        try:
-            self.gamepad = vg.VX360Gamepad()
-            self._update_status("Virtual gamepad initialized.")
-        except Exception as e:
-            self._update_status(f"Gamepad Error: {e}")
-            messagebox.showwarning("Gamepad Error", "Could not initialize virtual gamepad. Ensure ViGEmBus driver is installed.")
+        threading.Thread(target=self.core.check_gamepad_driver, daemon=True).start()
+        self._update_status(f"Ready in {self.startup.elapsed_ms():.0f} ms.")
+        if self.print_startup_report and sys.stdout: print(self.startup.report(), flush=True)
+        if self.exit_after_startup: self.root.after(0, self._quit_app)
 
     # --------------------------------------------------------------------------
-    # Core Action Logic (No changes in this section)
+    # Core Event Handling
     # --------------------------------------------------------------------------
-    def _prepare_target_window(self) -> Optional[int]:
-        hwnd = self.target_hwnd
-        if not hwnd:
-            self._update_status("Target window not set")
-            return None
-        if not win32gui.IsWindow(hwnd):
-            self.target_hwnd = None; self._update_ui_text(); self._update_status("Target window no longer exists.")
-            return None
-        try:
-            if win32gui.IsIconic(hwnd): win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            win32gui.SetForegroundWindow(hwnd); time.sleep(0.3 * self.settings['speed_multiplier'])
-            if win32gui.GetForegroundWindow() != hwnd:
-                self._update_status("Failed to bring target window to foreground"); return None
-        except win32gui.error as e:
-            self._update_status(f"Window activation error: {e}"); return None
-        return hwnd
-
-    def perform_game_actions(self):
-        initial_mouse = win32gui.GetCursorPos(); prev_hwnd = win32gui.GetForegroundWindow()
-        hwnd = self._prepare_target_window()
-        if not hwnd: return
-        try:
-            self._perform_camera_turn(); time.sleep(0.1 * self.settings['speed_multiplier'])
-            if self.gamepad:
-                self.gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_A); self.gamepad.update()
-                time.sleep(0.1)
-                self.gamepad.release_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_A); self.gamepad.update()
-            self._update_status(f"Actions sent to: {self.target_title}")
-        except Exception as e: self._update_status(f"Error during actions: {e}")
-        finally:
-            if prev_hwnd and win32gui.IsWindow(prev_hwnd) and win32gui.GetForegroundWindow() != prev_hwnd:
-                try: win32gui.SetForegroundWindow(prev_hwnd)
-                except win32gui.error: pass
-            try: win32api.SetCursorPos(initial_mouse)
-            except win32api.error: pass
-
-    def _perform_camera_turn(self):
-        if not self.gamepad: return
-        steps, radius, duration = 60, self.settings['circle_radius'], self.settings['action_duration']
-        for _ in range(self.settings['circle_loops']):
-            for i in range(steps + 1):
-                angle = (i / steps) * 2 * math.pi
-                x, y = math.cos(angle) * radius, math.sin(angle) * radius
-                self.gamepad.right_joystick_float(x_value_float=x, y_value_float=y); self.gamepad.update()
-                time.sleep(duration / steps)
-        self.gamepad.right_joystick_float(0.0, 0.0); self.gamepad.update()
-        
-    def _auto_loop(self):
-        while True:
-            if self.toggle and time.time() >= self.next_fire:
-                self.perform_game_actions()
-                self.next_fire = time.time() + self.settings['interval']
-            time.sleep(0.1)
+    def _on_core_event(self, event: str, data: Dict[str, Any]):
+        """Core listener; may run on any thread, so all Tk work is posted to the Tk loop."""
+        if event == 'status': self._update_status(data['message'])
+        elif event == 'quit': self.root.after(0, self._quit_app)
+        elif event == 'show_time': self.root.after(0, self._show_tooltip, data['message'])
+        elif event == 'error': self.root.after(0, self._show_core_error, data)
+        elif event == 'toggle': self.root.after(0, self._on_toggle, data['on'])
+        elif event == 'schedule': self.root.after(0, self._refresh_countdown)
+        elif event == 'queue': self.root.after(0, self._refresh_queue, data['stats'])
+        elif event == 'settings': self.root.after(0, self._on_setting_changed, data['key'], data['value'])
+        elif event in ('targets', 'hotkeys'): self.root.after(0, self._update_ui_text)
+
+    def _show_core_error(self, data: Dict[str, Any]):
+        messagebox.showerror(data['title'], data['message'])
+        if data.get('fatal'): self._quit_app()
+
+    def _on_toggle(self, on: bool):
+        self._set_icon('on' if on else 'off')
+        self._update_ui_text(); self._refresh_countdown()
+
+    def _refresh_countdown(self):
+        """Render the countdown, re-arming a single timer for the next whole second while auto is on."""
+        if self._countdown_job: self.root.after_cancel(self._countdown_job); self._countdown_job = None
+        if not self.core.toggle:
+            self.countdown_var.set("Auto action is OFF"); return
+        remaining = self.core.seconds_until_fire()
+        self.countdown_var.set(f"Next action in: {int(remaining)}s")
+        if remaining > 0: self._countdown_job = self.root.after(int((remaining % 1) * 1000) + 1, self._refresh_countdown)
+
+    def _on_setting_changed(self, key: str, value: Any):
+        """Keep the settings entries in sync with changes made elsewhere (e.g. options.ini edits)."""
+        entry = self.entries.get(key)
+        if entry and entry.get() != str(value): entry.delete(0, tk.END); entry.insert(0, str(value))
+
+    def _refresh_queue(self, stats: Dict[str, Any]):
+        self.queue_var.set(f"Queue: {stats['depth']} | Avg wait: {stats['wait_avg'] * 1000:.0f} ms | Cancelled: {stats['cancelled']}")
 
     # --------------------------------------------------------------------------
     # Hotkey and UI Action Methods
     # --------------------------------------------------------------------------
-    def _toggle_auto(self):
-        self.toggle = not self.toggle
-        if self.toggle:
-            self.next_fire = time.time() + self.settings['interval']
-            self._update_status("Auto Action: ON")
-            if self.tray_icon: self.tray_icon.icon = self.icon_on
-            self.root.iconbitmap(self.icon_on_path)
-        else:
-            self._update_status("Auto Action: OFF")
-            if self.tray_icon: self.tray_icon.icon = self.icon_off
-            self.root.iconbitmap(self.icon_off_path)
-        self._update_ui_text()
-
-    def manual_action(self):
-        threading.Thread(target=self.perform_game_actions, daemon=True).start()
-
-    def _show_time_left(self):
-        message = f"Next action in: {max(0, int(self.next_fire - time.time()))}s" if self.toggle else "Auto action is OFF"
-        self._update_status(message); self._show_tooltip(message)
-
-    def _set_target_window(self):
-        try:
-            hwnd = win32gui.GetForegroundWindow()
-            if not hwnd: self._update_status("Could not get foreground window."); return
-            self.target_hwnd = hwnd; self.target_title = win32gui.GetWindowText(hwnd)
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
-            self.target_proc_name = os.path.basename(win32process.GetModuleFileNameEx(handle, 0)); win32api.CloseHandle(handle)
-            self._update_ui_text(); self._update_status(f"Target window set to: {self.target_title}")
-        except Exception as e:
-            self.target_hwnd, self.target_title, self.target_proc_name = None, None, None
-            self._update_ui_text(); self._update_status(f"Error setting window: {e}")
-
-    def test_target_detection(self):
-        if self.target_hwnd and win32gui.IsWindow(self.target_hwnd):
-            self._update_status(f"Success! Target is '{self.target_title}'")
-        else:
-            self.target_hwnd = None; self._update_status("Failure: Target window not set or has been closed.")
-            self._update_ui_text()
-
-    def update_hotkeys(self):
-        for hotkey in self.registered_hotkeys:
-            try: keyboard.remove_hotkey(hotkey)
-            except Exception: pass
-        self.registered_hotkeys.clear()
-        actions = {'toggle_auto': self._toggle_auto, 'manual_action': self.manual_action, 'show_time': self._show_time_left, 
-                   'set_window': self._set_target_window, 'exit_app': self._quit_app}
-        for name, func in actions.items():
-            hotkey = self.hotkeys[name]
-            try:
-                keyboard.add_hotkey(hotkey, func); self.registered_hotkeys.append(hotkey)
-            except Exception as e: self._update_status(f"Failed to set hotkey '{hotkey}': {e}")
-        self._update_ui_text()
-
     def _start_listening(self, hotkey_name: str, str_var: tk.StringVar):
         if self.is_listening: return
         self.is_listening = True
-        for hotkey in self.registered_hotkeys: keyboard.remove_hotkey(hotkey)
+        self.core.suspend_hotkeys()
         self._update_status("Press a key combination..."); str_var.set("Listening...")
         for btn in self.keybind_buttons: btn.config(state="disabled")
         threading.Thread(target=self._hotkey_listener_thread, args=(hotkey_name, str_var), daemon=True).start()
@@ -240,7 +119,7 @@ class App:
         self.root.after(0, self._on_hotkey_recorded, hotkey, hotkey_name, str_var)
 
     def _on_hotkey_recorded(self, hotkey: str, hotkey_name: str, str_var: tk.StringVar):
-        self.hotkeys[hotkey_name] = hotkey; formatted_hotkey = self._format_hotkey(hotkey)
+        formatted_hotkey = self._format_hotkey(hotkey)
         str_var.set(formatted_hotkey)
         # --- FIX: Dynamically set width of the entry that was just changed ---
         entry_widget = self.keybind_entries.get(hotkey_name)
@@ -248,7 +127,7 @@ class App:
             entry_widget.config(width=len(formatted_hotkey) + 2)
         # -------------------------------------------------------------------
         self._update_status(f"New hotkey set to '{formatted_hotkey}'.")
-        self._save_config(); self.update_hotkeys()
+        self.core.set_hotkey(hotkey_name, hotkey)
         for btn in self.keybind_buttons: btn.config(state="normal")
         self.is_listening = False
 
@@ -264,6 +143,7 @@ class App:
         # -----------------------------------------------------------
 
         self.countdown_var = tk.StringVar(value="Auto action is OFF"); self.status_var = tk.StringVar(value="Status: Idle")
+        self.queue_var = tk.StringVar()
         self.manual_btn_text = tk.StringVar(); self.auto_btn_text = tk.StringVar(); self.test_btn_text = tk.StringVar()
         self.target_window_var = tk.StringVar()
 
@@ -280,12 +160,13 @@ class App:
         tab = ttk.Frame(parent_notebook, padding="10"); parent_notebook.add(tab, text='Controls')
         target_frame = ttk.LabelFrame(tab, text="Target Window", padding="10"); target_frame.pack(pady=5, fill="x")
         ttk.Label(target_frame, textvariable=self.target_window_var, wraplength=350, justify=tk.CENTER).pack()
-        ttk.Label(tab, textvariable=self.countdown_var, font=("Segoe UI", 12)).pack(pady=10)
+        ttk.Label(tab, textvariable=self.countdown_var, font=("Segoe UI", 12)).pack(pady=(10, 0))
+        ttk.Label(tab, textvariable=self.queue_var, font=("Segoe UI", 9)).pack(pady=(0, 10))
         settings_frame = ttk.Frame(tab); settings_frame.pack(pady=5)
         self._create_settings_entries(settings_frame)
-        ttk.Button(tab, textvariable=self.test_btn_text, command=self.test_target_detection).pack(pady=5, fill='x', side='bottom')
-        ttk.Button(tab, textvariable=self.auto_btn_text, command=self._toggle_auto).pack(pady=5, fill='x', side='bottom')
-        ttk.Button(tab, textvariable=self.manual_btn_text, command=self.manual_action).pack(pady=5, fill='x', side='bottom')
+        ttk.Button(tab, textvariable=self.test_btn_text, command=self.core.test_target_detection).pack(pady=5, fill='x', side='bottom')
+        ttk.Button(tab, textvariable=self.auto_btn_text, command=self.core.toggle_auto).pack(pady=5, fill='x', side='bottom')
+        ttk.Button(tab, textvariable=self.manual_btn_text, command=self.core.manual_action).pack(pady=5, fill='x', side='bottom')
 
     def _create_settings_entries(self, parent_frame: ttk.Frame):
         self.entries = {}
@@ -303,7 +184,7 @@ class App:
         tab = ttk.Frame(parent_notebook, padding="10"); parent_notebook.add(tab, text='Keybinds')
         keybind_frame = ttk.LabelFrame(tab, text="Click 'Change' then press your new hotkey", padding="10"); keybind_frame.pack(fill="x")
         keybind_defs = {"Toggle Auto Action:": "toggle_auto", "Manual Action:": "manual_action", "Show Time Left:": "show_time", 
-                        "Set Target Window:": "set_window", "Exit Application:": "exit_app"}
+                        "Set Target Window:": "set_window", "Add Target Window:": "add_window", "Exit Application:": "exit_app"}
         self.keybind_buttons.clear(); self.keybind_entries.clear()
         for i, (label, key) in enumerate(keybind_defs.items()):
             ttk.Label(keybind_frame, text=label).grid(row=i, column=0, sticky="w", pady=3)
@@ -321,44 +202,55 @@ class App:
     def _update_ui_text(self):
         self.manual_btn_text.set(f"Manual Action ({self._format_hotkey(self.hotkeys['manual_action'])})")
         self.test_btn_text.set("Test Target Detection")
-        if self.toggle: self.auto_btn_text.set(f"Stop Auto Action ({self._format_hotkey(self.hotkeys['toggle_auto'])})")
+        if self.core.toggle: self.auto_btn_text.set(f"Stop Auto Action ({self._format_hotkey(self.hotkeys['toggle_auto'])})")
         else: self.auto_btn_text.set(f"Start Auto Action ({self._format_hotkey(self.hotkeys['toggle_auto'])})")
-        if self.target_hwnd and self.target_title: self.target_window_var.set(f"{self.target_title} - {self.target_proc_name}")
+        targets: List[Target] = self.core.targets.all()
+        if targets: self.target_window_var.set(targets[0].label + (f" (+{len(targets) - 1} more)" if len(targets) > 1 else ""))
         else: self.target_window_var.set(f"No window set. Press '{self._format_hotkey(self.hotkeys['set_window'])}' on a window.")
 
     def _set_setting(self, key: str, entry_widget: ttk.Entry):
-        try:
-            value = entry_widget.get(); caster = type(self.settings[key]); new_val = caster(value)
-            if new_val <= 0 or (key == 'circle_radius' and not (0.0 < new_val <= 1.0)): raise ValueError
-            self.settings[key] = new_val; self._update_status(f"{key.replace('_', ' ').capitalize()} set to {new_val}"); self._save_config()
-        except (ValueError, TypeError): messagebox.showerror("Error", f"Please enter a valid positive number for {key}.")
-
-    def _update_gui_loop(self):
-        if self.toggle: self.countdown_var.set(f"Next action in: {max(0, int(self.next_fire - time.time()))}s")
-        else: self.countdown_var.set("Auto action is OFF")
-        self.root.after(200, self._update_gui_loop)
+        try: self.core.set_setting(key, entry_widget.get())
+        except ValueError: messagebox.showerror("Error", f"Please enter a valid positive number for {key}.")
 
     def _show_tooltip(self, text: str):
         tooltip = tk.Toplevel(self.root); tooltip.wm_overrideredirect(True); tooltip.wm_attributes("-topmost", True)
         label = ttk.Label(tooltip, text=text, padding=(5, 3), background=self.TOOLTIP_BG_COLOR, relief="solid", borderwidth=1, font=("Segoe UI", 9))
-        label.pack(); x, y = win32gui.GetCursorPos(); tooltip.geometry(f"+{x+20}+{y+10}") 
+        label.pack(); x, y = self.core.windows.get_cursor_pos(); tooltip.geometry(f"+{x+20}+{y+10}") 
         tooltip.after(2000, tooltip.destroy)
 
     # --------------------------------------------------------------------------
     # System Tray and Application Lifecycle (No changes in this section)
     # --------------------------------------------------------------------------
-    def _setup_tray_icon(self):
+    def _icon_image(self, state: str):
+        """Return the decoded 'on'/'off' icon, reading the .ico file only once."""
+        with self._icon_lock:
+            if state not in self._icon_images:
+                image = Image.open(self.icon_on_path if state == 'on' else self.icon_off_path); image.load()
+                self._icon_images[state] = image
+            return self._icon_images[state]
+
+    def _set_icon(self, state: str):
+        """Switch the tray and window icons to the cached 'on'/'off' image."""
         try:
-            self.icon_off = Image.open(self._resource_path("assets/off.ico"))
-            self.icon_on = Image.open(self._resource_path("assets/on.ico"))
-        except FileNotFoundError: messagebox.showerror("Error", "Icon files not found in 'assets' subfolder."); self._quit_app(); return
-        title = "silver's Anti-AFK"
-        menu = (pystray.MenuItem('Show', self.root.deiconify, default=True), pystray.MenuItem('Quit', self._quit_app))
-        self.tray_icon = pystray.Icon(title, self.icon_off, title, menu)
+            image = self._icon_image(state)
+            if self.tray_icon: self.tray_icon.icon = image
+            if state not in self._icon_photos: self._icon_photos[state] = ImageTk.PhotoImage(image)
+            self.root.iconphoto(False, self._icon_photos[state])
+        except (FileNotFoundError, tk.TclError) as e: self._update_status(f"Icon error: {e}")
+
+    def _setup_tray_icon(self):
+        with self.startup.stage('tray (background)'):
+            try:
+                icon_off = self._icon_image('off'); self._icon_image('on')
+            except FileNotFoundError: messagebox.showerror("Error", "Icon files not found in 'assets' subfolder."); self._quit_app(); return
+            title = "silver's Anti-AFK"
+            menu = (pystray.MenuItem('Show', self.root.deiconify, default=True), pystray.MenuItem('Quit', self._quit_app))
+            self.tray_icon = pystray.Icon(title, icon_off, title, menu)
         if self.tray_icon: self.tray_icon.run()
 
     def _quit_app(self):
         if self.tray_icon: self.tray_icon.stop()
+        self.core.shutdown()
         self.root.quit(); self.root.destroy()
     
     # --------------------------------------------------------------------------
@@ -387,8 +279,16 @@ class App:
         except ValueError: return False
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    sv_ttk.set_theme("dark")
+    parser = argparse.ArgumentParser(description="silver's Anti-AFK")
+    parser.add_argument('--startup-report', action='store_true', help="print per-stage startup timings")
+    parser.add_argument('--exit-after-startup', action='store_true', help="quit as soon as startup completes (for benchmarks)")
+    args = parser.parse_args()
+
+    startup = StartupTimer()
+    with startup.stage('tk root'):
+        root = tk.Tk()
+    with startup.stage('theme'):
+        sv_ttk.set_theme("dark")
 
     # --- FIX: Define custom styles for fonts and colors ---
     style = ttk.Style()
@@ -398,5 +298,6 @@ if __name__ == "__main__":
     style.configure("Status.TLabel", foreground="#00BFFF", font=("Segoe UI", 9))
     # ----------------------------------------------------
 
-    app = App(root)
+    app = App(root, startup)
+    app.print_startup_report, app.exit_after_startup = args.startup_report, args.exit_after_startup
     root.mainloop()
\ No newline at end of file
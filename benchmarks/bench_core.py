@@ -0,0 +1,237 @@
+# bench_core.py - Benchmarks for the scheduler, action path and config I/O.
+# Runs the real core against the in-process fake window, gamepad, hotkey and
+# idle backends, so it works on any OS, and compares the results with a stored
+# baseline. Every metric is "lower is better".
+#
+# Usage: python benchmarks/bench_core.py [--quick] [--baseline PATH] [--save-baseline] [--json PATH]
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import macro
+from bench_startup import bench_import
+from core import AntiAfkCore
+from gamepad import FakeGamepad, ReportingGamepad
+from hotkeys import FakeHotkeyBackend
+from idle import FakeIdleSource
+from scheduler import DeadlineScheduler
+from window import FakeWindowBackend
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+USER_HWND = 100
+
+Results = Dict[str, float]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FakeRig:
+    """An AntiAfkCore wired to fake backends, with ``targets`` game windows and a temp options.ini."""
+
+    def __init__(self, targets: int = 1, **settings):
+        self.dir = tempfile.mkdtemp(prefix='afk-bench-')
+        self.windows = FakeWindowBackend()
+        self.devices: List[FakeGamepad] = []
+        self.core = AntiAfkCore(windows=self.windows, config_path=os.path.join(self.dir, 'options.ini'),
+                                hotkey_backend=FakeHotkeyBackend(), idle=FakeIdleSource(),
+                                gamepad_factory=self._new_device)
+        self.core.settings.update(settings)
+        self.core.start()
+        self.windows.add_window(USER_HWND, 'Editor', 'editor.exe')
+        for hwnd in range(1, targets + 1):
+            self.windows.add_window(hwnd, f'Game {hwnd}', 'game.exe', focus_delay=0.005)
+            self.core.add_target(hwnd)
+        self.windows.foreground = USER_HWND
+
+    def _new_device(self) -> FakeGamepad:
+        device = FakeGamepad(); self.devices.append(device)
+        return device
+
+    def close(self):
+        self.core.shutdown()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+# ------------------------------------------------------------------------------
+# Benchmarks
+# ------------------------------------------------------------------------------
+def bench_scheduler(keys: int = 200, spread: float = 2.0) -> Results:
+    """Lateness of DeadlineScheduler callbacks for deadlines spread over ``spread`` seconds."""
+    deadlines, lateness, done = {}, [], threading.Event()
+    scheduler = DeadlineScheduler(None)
+
+    def on_due(due):
+        now = scheduler.clock()
+        lateness.extend(now - deadlines[key] for key in due)
+        if len(lateness) >= keys: done.set()
+
+    scheduler.callback = on_due
+    scheduler.start()
+    start = scheduler.clock() + 0.05
+    for i in range(keys):
+        deadlines[i] = start + spread * ((i * 7919) % keys) / keys  # Shuffled, evenly spread deadlines
+        scheduler.schedule(i, deadlines[i])
+    done.wait(spread + 5)
+    scheduler.stop()
+    return {'scheduler.lateness_p50_ms': _ms(_quantile(lateness, 0.5)),
+            'scheduler.lateness_p99_ms': _ms(_quantile(lateness, 0.99))}
+
+
+def bench_auto_loop(seconds: float = 3.0) -> Results:
+    """Lateness of auto actions fired by the core (scheduler, executor and action path together)."""
+    rig = FakeRig(targets=3, interval=1, action_duration=0.1, batch_window=0.0)
+    try:
+        rig.core.set_auto(True)
+        time.sleep(seconds)
+        rig.core.set_auto(False)
+        snapshot = rig.core.metrics.snapshot()['histograms']
+        lateness = snapshot.get('schedule_lateness{target="game.exe"}') or {}
+        return {'auto.lateness_mean_ms': _ms(lateness['sum'] / lateness['count']) if lateness.get('count') else 0.0}
+    finally:
+        rig.close()
+
+
+def bench_camera_turn(duration: float = 0.2, loops=(1, 2, 4), radii=(0.4, 0.8, 1.0), repeats: int = 3) -> Results:
+    """Absolute error between the played and the planned camera-turn duration (median of ``repeats``)."""
+    results, errors = {}, []
+    for loop_count in loops:
+        for radius in radii:
+            timeline = macro.compile_macro(f"turn circle {radius} {duration} {loop_count}")
+            samples = []
+            for _ in range(repeats):
+                pad = ReportingGamepad(FakeGamepad())
+                start = time.perf_counter()
+                macro.play(timeline, lambda state, due: (pad.set_state(state), pad.update(due)))
+                pad.flush()
+                samples.append(abs(time.perf_counter() - start - duration * loop_count))
+            error = statistics.median(samples)
+            errors.append(error)
+            results[f'camera_turn.error_ms[loops={loop_count},radius={radius}]'] = _ms(error)
+    results['camera_turn.error_max_ms'] = _ms(max(errors))
+    return results
+
+
+def bench_reports_per_action(actions: int = 5) -> Results:
+    """Device reports sent per default action, and the wall time of one single-target action."""
+    rig = FakeRig(targets=1, action_duration=0.25)
+    try:
+        durations = []
+        for _ in range(actions):
+            start = time.perf_counter(); rig.core.perform_game_actions(); durations.append(time.perf_counter() - start)
+        reports = sum(len(device.reports) for device in rig.devices)
+        return {'action.reports_per_action': round(reports / actions, 2),
+                'action.wall_median_ms': _ms(statistics.median(durations))}
+    finally:
+        rig.close()
+
+
+def bench_config(iterations: int = 50) -> Results:
+    """Cost of loading and atomically saving options.ini, and of a debounced set."""
+    rig = FakeRig(targets=0)
+    try:
+        store = rig.core.store
+        for proc in range(5): store.set_section(f'Target:game{proc}.exe', {'interval': 30, 'circle_radius': 0.5})
+        store.save_now()
+
+        def timed(func: Callable[[], None]) -> float:
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter(); func(); samples.append(time.perf_counter() - start)
+            return statistics.median(samples)
+
+        return {'config.load_median_ms': _ms(timed(store.load)),
+                'config.save_median_ms': _ms(timed(store.save_now)),
+                'config.set_median_ms': _ms(timed(lambda: rig.core.set_setting('interval', 7)))}
+    finally:
+        rig.close()
+
+
+def bench_startup(runs: int) -> Results:
+    """Cold `import afk` time and in-process core construction and start time."""
+    results = {'startup.import_afk_median_ms': bench_import(runs)['median_ms']}
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter(); rig = FakeRig(targets=0); samples.append(time.perf_counter() - start)
+        rig.close()
+    results['startup.core_start_median_ms'] = _ms(statistics.median(samples))
+    return results
+
+
+# ------------------------------------------------------------------------------
+# Baseline Comparison
+# ------------------------------------------------------------------------------
+def compare(results: Results, baseline: Results, tolerance: float, slack_ms: float) -> List[str]:
+    """Names and numbers of metrics worse than baseline by more than ``tolerance`` and ``slack_ms``."""
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None: continue
+        limit = base * (1 + tolerance) + slack_ms
+        if value > limit: regressions.append(f"{name}: {value} (baseline {base}, limit {limit:.3f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler, action path and config benchmarks on fake backends")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations and a shorter auto-mode run")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters for the import benchmark")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed relative slowdown (default 0.5 = 50%%)")
+    parser.add_argument('--slack-ms', type=float, default=5.0, help="allowed absolute slowdown on top of the tolerance")
+    parser.add_argument('--json', metavar='PATH', help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    runs = 2 if args.quick else args.runs
+    results: Results = {}
+    for name, bench in (('scheduler', lambda: bench_scheduler(100 if args.quick else 200)),
+                        ('auto loop', lambda: bench_auto_loop(2.0 if args.quick else 3.0)),
+                        ('camera turn', lambda: bench_camera_turn(repeats=1 if args.quick else 3)),
+                        ('reports per action', lambda: bench_reports_per_action(2 if args.quick else 5)),
+                        ('config', lambda: bench_config(10 if args.quick else 50)),
+                        ('startup', lambda: bench_startup(runs))):
+        print(f"Running {name}...", flush=True)
+        results.update(bench())
+
+    for name, value in results.items(): print(f"  {name:<52} {value:>10}")
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': f"{platform.system()} {platform.machine()} Python {platform.python_version()}",
+                       'results': results}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to store one.")
+        return
+    with open(args.baseline) as f: baseline = json.load(f)
+    regressions = compare(results, baseline['results'], args.tolerance, args.slack_ms)
+    print(f"Compared with baseline from {baseline.get('machine', 'unknown machine')}:")
+    for line in regressions: print(f"  REGRESSION {line}")
+    if regressions: sys.exit(1)
+    print("  no regressions")
+
+
+if __name__ == '__main__':
+    main()
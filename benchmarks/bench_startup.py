@@ -0,0 +1,87 @@
+# bench_startup.py - Repeatable cold-start benchmark for the Anti-AFK tool.
+# Times `import afk` in fresh interpreters, the eager import cost of each heavy
+# dependency, and (with --gui) the full staged startup reported by afk.py.
+#
+# Usage: python benchmarks/bench_startup.py [--runs N] [--gui] [--json results.json]
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['keyboard', 'pystray', 'PIL.Image', 'sv_ttk', 'vgamepad', 'win32gui', 'win32api', 'win32process']
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=ROOT_DIR, capture_output=True, text=True)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {'median_ms': round(statistics.median(samples), 2), 'min_ms': round(min(samples), 2),
+            'max_ms': round(max(samples), 2), 'runs': len(samples)}
+
+
+def bench_import(runs: int) -> Dict[str, float]:
+    """Wall time of `import afk` in a fresh interpreter, minus interpreter startup."""
+    baseline, samples = [], []
+    for _ in range(runs):
+        start = time.perf_counter(); _run(['-c', 'pass']); baseline.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter(); result = _run(['-c', 'import afk'])
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0: raise RuntimeError(f"'import afk' failed:\n{result.stderr}")
+    offset = statistics.median(baseline)
+    return _summary([max(0.0, s - offset) for s in samples])
+
+
+def bench_module_imports() -> Dict[str, Optional[float]]:
+    """Cumulative import time (ms) of each heavy module, as reported by -X importtime."""
+    costs = {}
+    for module in HEAVY_MODULES:
+        result = _run(['-X', 'importtime', '-c', f'import {module}'])
+        if result.returncode != 0:
+            costs[module] = None  # Not installed on this machine
+            continue
+        match = re.search(rf"\|\s*(\d+)\s*\|\s*{re.escape(module)}\s*$", result.stderr, re.MULTILINE)
+        costs[module] = round(int(match.group(1)) / 1000, 2) if match else None
+    return costs
+
+
+def bench_gui_startup(runs: int) -> Dict[str, Dict[str, float]]:
+    """Per-stage startup timings from `afk.py --startup-report --exit-after-startup`."""
+    stages: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        result = _run(['afk.py', '--startup-report', '--exit-after-startup'])
+        if result.returncode != 0: raise RuntimeError(f"afk.py failed to start:\n{result.stderr}")
+        for name, ms in re.findall(r"^\s{2}(.+?)\s+([\d.]+) ms$", result.stdout, re.MULTILINE):
+            stages.setdefault(name, []).append(float(ms))
+    return {name: _summary(samples) for name, samples in stages.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for afk.py")
+    parser.add_argument('--runs', type=int, default=10, help="fresh interpreters per measurement")
+    parser.add_argument('--gui', action='store_true', help="also time the full GUI startup (needs Windows and a display)")
+    parser.add_argument('--json', metavar='PATH', help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    results = {'import_afk': bench_import(args.runs), 'module_imports': bench_module_imports()}
+    if args.gui: results['gui_startup'] = bench_gui_startup(args.runs)
+
+    print(f"import afk: {results['import_afk']['median_ms']:.1f} ms median over {args.runs} runs")
+    print("Eager import cost of deferred modules:")
+    for module, ms in results['module_imports'].items():
+        print(f"  {module:<14} {'not installed' if ms is None else f'{ms:.1f} ms'}")
+    for name, summary in results.get('gui_startup', {}).items():
+        print(f"  {name:<32} {summary['median_ms']:8.1f} ms")
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,8 @@ SCRIPT_NAME = Path('afk.py')
 EXECUTABLE_NAME = "silvers-anti-afk"
 ASSETS_FOLDER = Path('assets')
 ICON_FILE = Path('off.ico')
+# Modules loaded through startup.lazy_import are invisible to PyInstaller's import scan
+HIDDEN_IMPORTS = ['keyboard', 'pystray', 'PIL.Image', 'PIL.ImageTk', 'sv_ttk', 'vgamepad']
 
 def build():
     """
@@ -49,6 +51,7 @@ def build():
         f'--add-data={vgpad_path}{os.pathsep}vgamepad',
         '--clean',
     ]
+    pyinstaller_args += [f'--hidden-import={module}' for module in HIDDEN_IMPORTS]
 
     # 3. Add the icon argument only if the icon file actually exists
     if icon_path.exists():
@@ -0,0 +1,230 @@
+# config_store.py - In-memory options.ini with debounced atomic saves and hot reload.
+# Reads are served from a parsed snapshot, writes are merged and flushed by a
+# background thread through a temp file and rename, and external edits to the
+# file are picked up and reported as a diff.
+
+import configparser
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Snapshot = Dict[str, Dict[str, Any]]
+ChangeListener = Callable[[Snapshot], None]
+
+TARGET_PREFIX = 'Target:'
+
+
+def cast_value(default: Any, value: Any) -> Any:
+    """Convert ``value`` (usually a string from the INI file) to the type of ``default``."""
+    if isinstance(default, bool):
+        if isinstance(value, bool): return value
+        text = str(value).strip().lower()
+        if text in ('1', 'true', 'yes', 'on'): return True
+        if text in ('0', 'false', 'no', 'off'): return False
+        raise ValueError(f"Not a boolean: {value!r}")
+    if isinstance(default, int) and isinstance(value, str): return int(float(value)) if '.' in value else int(value)
+    return type(default)(value)
+
+
+class ConfigStore:
+    """Typed view of options.ini.
+
+    ``defaults`` maps section names ('Settings', 'Keybinds') to their default
+    values; ``Target:<proc_name>`` sections are typed like 'Settings'. Changes
+    made with ``set`` are written ``save_delay`` seconds after the last one, in
+    the background. The file is polled every ``poll_interval`` seconds and
+    external edits are passed to ``on_change`` as ``{section: {key: value}}``
+    (a value of None means the key or section was removed). A failed save is
+    retried after ``retry_delay`` seconds.
+    """
+
+    def __init__(self, path: str, defaults: Snapshot, save_delay: float = 0.5, poll_interval: float = 2.0,
+                 on_change: Optional[ChangeListener] = None, on_error: Optional[Callable[[Exception], None]] = None,
+                 retry_delay: float = 5.0):
+        self.path = path
+        self.defaults = {section: dict(values) for section, values in defaults.items()}
+        self.save_delay = save_delay
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.on_error = on_error
+        self.retry_delay = retry_delay
+        self._cond = threading.Condition()
+        self._data: Snapshot = {section: dict(values) for section, values in self.defaults.items()}
+        self._save_at: Optional[float] = None
+        self._file_stamp: Optional[Tuple[float, int]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.saves = 0
+        self.reloads = 0
+
+    # --------------------------------------------------------------------------
+    # Reading and Writing Values
+    # --------------------------------------------------------------------------
+    def load(self):
+        """Read the file into the snapshot, creating it from the defaults if missing."""
+        if not os.path.exists(self.path):
+            self.save_now()
+            return
+        data, stamp = self._read_file()
+        with self._cond:
+            self._data, self._file_stamp = data, stamp
+
+    def get(self, section: str, key: str, fallback: Any = None) -> Any:
+        with self._cond: return self._data.get(section, {}).get(key, fallback)
+
+    def section(self, section: str) -> Dict[str, Any]:
+        """Copy of one section from the snapshot."""
+        with self._cond: return dict(self._data.get(section, {}))
+
+    def snapshot(self) -> Snapshot:
+        with self._cond: return {section: dict(values) for section, values in self._data.items()}
+
+    def set(self, section: str, key: str, value: Any):
+        """Update the snapshot and schedule a background save."""
+        with self._cond:
+            self._data.setdefault(section, {})[key] = value
+            self._schedule_save()
+
+    def set_section(self, section: str, values: Dict[str, Any]):
+        """Replace a whole section and schedule a background save."""
+        with self._cond:
+            self._data[section] = dict(values)
+            self._schedule_save()
+
+    def _schedule_save(self):
+        self._save_at = time.monotonic() + self.save_delay
+        self._cond.notify()
+
+    # --------------------------------------------------------------------------
+    # File I/O
+    # --------------------------------------------------------------------------
+    def _parse(self, parser: configparser.ConfigParser) -> Snapshot:
+        data = {section: dict(values) for section, values in self.defaults.items()}
+        settings_defaults = self.defaults.get('Settings', {})
+        for section in parser.sections():
+            if section in self.defaults:
+                for key, default in self.defaults[section].items():
+                    if parser.has_option(section, key):
+                        try: data[section][key] = cast_value(default, parser.get(section, key))
+                        except ValueError: pass  # Keep the default for a malformed value
+            elif section.startswith(TARGET_PREFIX):
+                overrides = {}
+                for key, value in parser.items(section):
+                    if key not in settings_defaults: continue
+                    try: overrides[key] = cast_value(settings_defaults[key], value)
+                    except ValueError: pass
+                data[section] = overrides
+        return data
+
+    def _stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _new_parser() -> configparser.ConfigParser:
+        # No interpolation: values such as paths and tokens may contain '%'
+        return configparser.ConfigParser(interpolation=None)
+
+    def _read_file(self) -> Tuple[Snapshot, Optional[Tuple[float, int]]]:
+        """Parse the file; raises OSError, or ValueError if it is not valid INI."""
+        parser = self._new_parser()
+        stamp = self._stamp()
+        try: parser.read(self.path)
+        except configparser.Error as e: raise ValueError(f"{self.path} is not a valid options file: {e}") from e
+        return self._parse(parser), stamp
+
+    def save_now(self):
+        """Write the snapshot to disk immediately through a temp file and rename."""
+        with self._cond:
+            parser = self._new_parser()
+            for section, values in self._data.items():
+                parser[section] = {k: str(v) for k, v in values.items()}
+            self._save_at = None
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.options-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                parser.write(f)
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+        with self._cond:
+            self._file_stamp = self._stamp()
+            self.saves += 1
+
+    def flush(self):
+        """Write any pending change now."""
+        with self._cond: pending = self._save_at is not None
+        if pending: self.save_now()
+
+    def check_for_changes(self) -> Snapshot:
+        """Reload the file if it changed on disk; returns (and reports) the changed keys."""
+        stamp = self._stamp()
+        with self._cond:
+            if stamp is None or stamp == self._file_stamp: return {}
+        data, stamp = self._read_file()
+        with self._cond:
+            old, changes = self._data, {}
+            for section in set(old) | set(data):
+                before, after = old.get(section, {}), data.get(section)
+                if after is None:
+                    changes[section] = None
+                    continue
+                diff = {k: after.get(k) for k in set(before) | set(after) if before.get(k) != after.get(k)}
+                if diff: changes[section] = diff
+            self._data, self._file_stamp = data, stamp
+            self.reloads += 1
+        if changes and self.on_change: self.on_change(changes)
+        return changes
+
+    # --------------------------------------------------------------------------
+    # Background Worker
+    # --------------------------------------------------------------------------
+    def start(self):
+        """Start the background saver and file watcher."""
+        with self._cond:
+            if self._running: return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, name="config-store", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker and write any pending change."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread(): self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _worker(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            with self._cond:
+                if not self._running: return
+                now = time.monotonic()
+                wake_at = next_poll if self._save_at is None else min(next_poll, self._save_at)
+                if now < wake_at:
+                    self._cond.wait(wake_at - now)
+                    continue
+                save_due = self._save_at is not None and now >= self._save_at
+            try:
+                if save_due: self.save_now()
+                if now >= next_poll:
+                    # Skip the reload while our own change is still waiting to be written
+                    with self._cond: pending = self._save_at is not None
+                    next_poll = now + self.poll_interval
+                    if not pending: self.check_for_changes()
+            except Exception as e:
+                if save_due:  # Retry later instead of spinning on a save that keeps failing
+                    with self._cond:
+                        if self._save_at is None or self._save_at <= now: self._save_at = now + self.retry_delay
+                if self.on_error: self.on_error(e)
@@ -0,0 +1,755 @@
+# core.py - GUI-independent core of the Anti-AFK tool.
+# Owns the settings, config file, targets, scheduler, action executor, gamepad
+# pool and hotkeys. Views subscribe to state-change events instead of polling.
+# Run this file directly for a headless instance without tkinter.
+
+import argparse
+import glob
+import itertools
+import os
+import secrets
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from startup import StartupTimer, lazy_import
+from scheduler import DeadlineScheduler
+import trajectory
+import macro
+from gamepad import DevicePool, ReportingGamepad
+from executor import ActionExecutor
+from window import FOCUS_POLICIES, FOCUS_POLICY_ALIASES, FocusAcquirer, Win32WindowBackend, WindowBackend, WindowError, WindowIndex
+from targets import Target, TargetRegistry
+from metrics import Metrics
+from config_store import TARGET_PREFIX, ConfigStore, Snapshot, cast_value
+from hotkeys import HotkeyBackend, HotkeyDispatcher
+from idle import IdleSource, Win32IdleSource
+from ipc import ControlServer
+from inputtrace import TraceError, TraceWriter
+
+vg = lazy_import('vgamepad')
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+
+class AntiAfkCore:
+    """Scheduler, actions, config and hotkeys, with push-based state events.
+
+    Events are delivered as ``listener(event, data)`` on whichever thread caused
+    them: 'status', 'toggle', 'targets', 'schedule', 'queue', 'settings',
+    'hotkeys', 'show_time', 'error' and 'quit'.
+    """
+
+    IDLE_GATE_MARGIN = 10.0  # Seconds before idle_threshold at which a gated target fires anyway
+
+    def __init__(self, windows: Optional[WindowBackend] = None, config_path: Optional[str] = None,
+                 startup: Optional[StartupTimer] = None, hotkey_backend: Optional[HotkeyBackend] = None,
+                 idle: Optional[IdleSource] = None, gamepad_factory: Optional[Callable[[], Any]] = None):
+        self.startup = startup or StartupTimer()
+        self.config_path = config_path or self._default_config_path()
+        self._listeners: List[Listener] = []
+        self.pool: Optional[DevicePool] = None
+        self.toggle = False
+        self.targets = TargetRegistry()
+        self._due_targets: List[str] = []
+        self._due_lock = threading.Lock()
+        self.scheduler = DeadlineScheduler(self._on_deadlines)
+        self.executor = ActionExecutor(self._run_action)
+        self.quit_event = threading.Event()
+        self.metrics = Metrics()
+        self.idle = idle  # Created on first use when None, see _idle_seconds
+        self.gamepad_factory = gamepad_factory  # Makes the raw device; vg.VX360Gamepad when None
+        self.ipc: Optional[ControlServer] = None
+        self.trace: Optional[TraceWriter] = None
+        self._trace_actions = itertools.count(1)
+        self.hotkey_dispatcher = HotkeyDispatcher(self._on_hotkey, hotkey_backend, metrics=self.metrics,
+                                                  on_error=lambda name, e: self.status(f"Hotkey '{name}' failed: {e}"))
+
+        with self.startup.stage('config'):
+            self._setup_variables()
+            self.store = ConfigStore(self.config_path, {'Settings': self.settings, 'Keybinds': self.hotkeys},
+                                     on_change=self._on_config_changed, on_error=lambda e: self.status(f"Config error: {e}"))
+            self.load_config()
+            self.scheduler.batch_window = self.settings['batch_window']
+        with self.startup.stage('window backend'):
+            self.windows = windows or Win32WindowBackend()
+            self.focus = FocusAcquirer(self.windows)
+            self.window_index = WindowIndex(self.windows)
+
+    def start(self):
+        """Start the gamepad pool and the scheduler and executor workers."""
+        with self.startup.stage('workers'):
+            self._setup_vgamepad()
+            self.executor.start()
+            self.scheduler.start()
+            self.hotkey_dispatcher.start()
+            self.store.start()
+            self._restart_ipc()
+            self._restart_trace()
+
+    def shutdown(self):
+        """Stop all work, write pending config changes and release hotkeys and gamepads."""
+        self.toggle = False
+        self.scheduler.stop(); self.executor.stop()
+        self.hotkey_dispatcher.stop()
+        if self.ipc: self.ipc.stop(); self.ipc = None
+        if self.pool: self.pool.close()
+        if self.trace: self.trace.close(); self.trace = None
+        try: self.store.stop()
+        except OSError as e: self.status(f"Error saving config: {e}")
+
+    # --------------------------------------------------------------------------
+    # Events
+    # --------------------------------------------------------------------------
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Register ``listener`` for state-change events; returns an unsubscribe function."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _emit(self, event: str, **data):
+        for listener in list(self._listeners):
+            try: listener(event, data)
+            except Exception: pass  # A broken view must not break the core
+
+    def status(self, message: str):
+        self._emit('status', message=message)
+
+    def _emit_schedule(self):
+        self._emit('schedule', remaining=self.seconds_until_fire() if self.toggle else None)
+
+    def _emit_targets(self):
+        self._emit('targets', targets=self.targets.all())
+
+    # --------------------------------------------------------------------------
+    # Setup and Configuration Methods
+    # --------------------------------------------------------------------------
+    def _setup_variables(self):
+        """Initialize default settings and hotkeys."""
+        self.settings = {
+            'interval': 6, 'speed_multiplier': 1.0, 'action_duration': 1.0,
+            'circle_radius': 0.8, 'circle_loops': 1, 'camera_shape': 'circle',
+            'report_rate': 250, 'focus_timeout': 1.0, 'batch_window': 2.0,
+            'gamepad_idle_timeout': 600.0, 'metrics_dir': '', 'action_macro': '',
+            'focus_policy': 'always', 'idle_gate': False, 'idle_threshold': 240.0,
+            'ipc_port': 0, 'ipc_token': '', 'trace_file': '', 'trace_capacity': 65536,
+            'rebind_windows': True, 'rebind_title': '', 'window_scan_interval': 2.0
+        }
+        self.hotkeys = {
+            'toggle_auto': 'f1', 'manual_action': 'f2', 'show_time': 'f3',
+            'set_window': 'f4', 'add_window': 'ctrl+shift+f4', 'exit_app': 'ctrl+o'
+        }
+        # proc_name -> settings from [Target:<proc_name>], shared by every window of that process
+        self.target_overrides: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _default_config_path() -> str:
+        """Get the path for the config file, compatible with PyInstaller."""
+        base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(base_dir, 'options.ini')
+
+    def load_config(self):
+        """Load configuration from options.ini into the in-memory snapshot."""
+        try: self.store.load()
+        except (OSError, ValueError) as e: self.status(f"Error loading config: {e}")
+        self.settings.update(self._valid_settings(self.store.section('Settings'), '[Settings]'))
+        self.hotkeys.update(self.store.section('Keybinds'))
+        for section, values in self.store.snapshot().items():
+            if section.startswith(TARGET_PREFIX):
+                self.target_overrides[section[len(TARGET_PREFIX):]] = self._valid_settings(values, f'[{section}]')
+
+    def _valid_settings(self, values: Dict[str, Any], section: str) -> Dict[str, Any]:
+        """The valid entries of ``values``, validated; invalid ones are dropped with a status message."""
+        valid = {}
+        for key, value in values.items():
+            try: valid[key] = self._validate_setting(key, value)
+            except ValueError as e: self.status(f"Ignoring options.ini {section} value: {e}")
+        return valid
+
+    def _validate_setting(self, key: str, value: Any) -> Any:
+        """Return ``value`` converted for setting ``key``; raises ValueError if it is invalid."""
+        if key not in self.settings: raise ValueError(f"Unknown setting '{key}'.")
+        try: new_val = cast_value(self.settings[key], value)
+        except (ValueError, TypeError): raise ValueError(f"Invalid value for {key}: {value!r}") from None
+        if key == 'camera_shape':
+            if new_val not in trajectory.SHAPES: raise ValueError(f"Unknown camera shape '{new_val}'.")
+        elif key == 'ipc_port':
+            if not 0 <= new_val <= 65535: raise ValueError("ipc_port must be between 0 (off) and 65535.")
+        elif key == 'focus_policy':
+            new_val = FOCUS_POLICY_ALIASES.get(new_val, new_val)
+            if new_val not in FOCUS_POLICIES: raise ValueError(f"Focus policy must be one of: {', '.join(FOCUS_POLICIES)}.")
+        elif key == 'action_macro':
+            if new_val.strip():
+                try: macro.compile_macro(new_val)
+                except macro.MacroError as e: raise ValueError(f"Invalid action macro: {e}") from None
+        elif isinstance(new_val, (str, bool)):
+            pass
+        elif new_val <= 0 or (key == 'circle_radius' and not (0.0 < new_val <= 1.0)):
+            raise ValueError(f"Please enter a valid positive number for {key}.")
+        return new_val
+
+    def set_setting(self, key: str, value: Any):
+        """Validate, apply and persist one setting. Raises ValueError if it is invalid."""
+        self._set_valid_setting(key, self._validate_setting(key, value))
+
+    def set_settings(self, values: Dict[str, Any]):
+        """Set several settings at once; if any is invalid, raises ValueError and changes nothing."""
+        valid = {key: self._validate_setting(key, value) for key, value in values.items()}
+        for key, new_val in valid.items(): self._set_valid_setting(key, new_val)
+
+    def _set_valid_setting(self, key: str, new_val: Any):
+        self.settings[key] = new_val
+        self._apply_setting(key, new_val)
+        self.status(f"{key.replace('_', ' ').capitalize()} set to {new_val}")
+        self.store.set('Settings', key, new_val)
+        self._emit('settings', key=key, value=new_val)
+
+    def _on_config_changed(self, changes: Snapshot):
+        """ConfigStore callback: apply edits made to options.ini outside the app."""
+        applied = 0
+        for key, value in (changes.get('Settings') or {}).items():
+            if value is None or value == self.settings.get(key): continue
+            try: new_val = self._validate_setting(key, value)
+            except ValueError as e: self.status(f"Ignoring options.ini value: {e}"); continue
+            self.settings[key] = new_val; self._apply_setting(key, new_val); applied += 1
+            self._emit('settings', key=key, value=new_val)
+        keybinds = {k: v for k, v in (changes.get('Keybinds') or {}).items() if v is not None}
+        if keybinds:
+            self.hotkeys.update(keybinds); applied += len(keybinds)
+            if self.registered_hotkeys: self.update_hotkeys()
+        for section, values in changes.items():
+            if not section.startswith(TARGET_PREFIX): continue
+            proc_name = section[len(TARGET_PREFIX):]
+            overrides = self._valid_settings(self.store.section(section), f'[{section}]') if values is not None else {}
+            if overrides: self.target_overrides[proc_name] = overrides
+            else: self.target_overrides.pop(proc_name, None)
+            for target in self.targets.all():
+                if target.proc_name != proc_name: continue
+                target.settings.clear(); target.settings.update(overrides)
+                if self.toggle: self._schedule_auto(target)
+            applied += 1
+        if applied:
+            self.status(f"Reloaded options.ini ({applied} change{'s' if applied != 1 else ''}).")
+            self._emit_schedule()
+
+    def _apply_setting(self, key: str, new_val: Any):
+        """Push a changed setting into the running subsystems."""
+        if key == 'interval' and self.toggle:
+            for target in self.targets.all():
+                if 'interval' in target.settings: continue
+                target.deadline = target.anchor + new_val
+                self.scheduler.schedule(('auto', target.target_id), target.deadline)
+            self._emit_schedule()
+        if key == 'batch_window': self.scheduler.batch_window = new_val
+        if key == 'report_rate' and self.pool:
+            for pad in self.pool.devices(): pad.rate = new_val
+        if key == 'gamepad_idle_timeout' and self.pool: self.pool.idle_timeout = new_val
+        if key in ('ipc_port', 'ipc_token') and self.pool: self._restart_ipc()  # Only once start() has run
+        if key in ('trace_file', 'trace_capacity') and self.pool: self._restart_trace()
+
+    def _restart_ipc(self):
+        """(Re-)start the local control server on ``ipc_port``; 0 turns it off.
+
+        The API always needs a token: one is generated and saved on first start.
+        """
+        if self.ipc: self.ipc.stop(); self.ipc = None
+        port = self.settings['ipc_port']
+        if not port: return
+        if not self.settings['ipc_token']:
+            self.settings['ipc_token'] = secrets.token_urlsafe(16)
+            self.store.set('Settings', 'ipc_token', self.settings['ipc_token'])
+            self.status(f"Generated an ipc_token for the control API in {self.config_path}")
+        try:
+            self.ipc = ControlServer(self, port, self.settings['ipc_token']); self.ipc.start()
+            self.status(f"Control API listening on 127.0.0.1:{port}")
+        except OSError as e: self.status(f"Cannot start control API on port {port}: {e}")
+
+    def _restart_trace(self):
+        """(Re-)open the input trace ring file named by ``trace_file``; empty turns tracing off."""
+        if self.trace: self.trace.close(); self.trace = None
+        path = self.settings['trace_file']
+        if not path: return
+        path = os.path.join(os.path.dirname(os.path.abspath(self.config_path)), path)
+        try: self.trace = TraceWriter(path, self.settings['trace_capacity'])
+        except (OSError, ValueError, TraceError) as e: self.status(f"Cannot open input trace {path}: {e}")
+
+    def _setup_vgamepad(self):
+        """Set up the virtual gamepad pool; controllers are created on first use."""
+        self.pool = DevicePool(self._create_gamepad, idle_timeout=self.settings['gamepad_idle_timeout'], close=self._close_gamepad)
+
+    def _create_gamepad(self) -> ReportingGamepad:
+        device = self.gamepad_factory() if self.gamepad_factory else vg.VX360Gamepad()
+        return ReportingGamepad(device, rate=self.settings['report_rate'])
+
+    @staticmethod
+    def _close_gamepad(pad: ReportingGamepad):
+        pad.reset(); pad.update(); pad.flush(); pad.close()
+
+    def check_gamepad_driver(self):
+        """Import vgamepad now (call from a background thread) so the first action does not pay for it."""
+        if self.gamepad_factory: return
+        with self.startup.stage('vgamepad import (background)'):
+            try: vg._load()
+            except ImportError:
+                self._emit('error', title="Dependency Missing", fatal=True,
+                           message="vgamepad library is required. Please install it and the ViGEmBus driver.")
+
+    # --------------------------------------------------------------------------
+    # Core Action Logic
+    # --------------------------------------------------------------------------
+    def _needs_focus(self, target: Target) -> bool:
+        """Apply the target's focus policy: should it be brought to the foreground first?"""
+        policy = target.setting('focus_policy', self.settings)
+        if policy == 'never': return False
+        if policy == 'minimized':
+            try: return not self.windows.accepts_background_input(target.hwnd)
+            except WindowError: return True
+        return True
+
+    def _prepare_target_window(self, target: Target, focus: bool = True) -> Optional[int]:
+        if not self.windows.is_window(target.hwnd) and not self._rebind_target(target):
+            if target.setting('rebind_windows', self.settings):
+                self.status(f"Target window '{target.title}' is gone; waiting for {target.proc_name} to come back.")
+                self._schedule_window_scan()
+            else:
+                self._remove_target(target); self.status(f"Target window '{target.title}' no longer exists.")
+            return None
+        hwnd = target.hwnd
+        if not focus:
+            self.metrics.increment('focus_skipped', target=target.proc_name)
+            return hwnd
+        try:
+            timeout = target.setting('focus_timeout', self.settings) * target.setting('speed_multiplier', self.settings)
+            with self.metrics.timer('focus', target=target.proc_name):
+                acquired = self.focus.acquire(hwnd, timeout, key=target.proc_name or hwnd)
+            if acquired is None:
+                self.metrics.increment('focus_failures', target=target.proc_name)
+                self.status(f"Failed to bring '{target.title}' to foreground"); return None
+        except WindowError as e:
+            self.status(f"Window activation error: {e}"); return None
+        return hwnd
+
+    def perform_game_actions(self, targets: Optional[List[Target]] = None, cancel: Optional[threading.Event] = None):
+        """Visit each target back to back, restoring the user's window and cursor once at the end.
+
+        Targets whose focus policy lets them take input in the background are
+        never activated; if no target needed focus, nothing is restored either.
+        """
+        cancel = cancel or threading.Event()
+        targets = self.targets.all() if targets is None else targets
+        if not targets: self.status("Target window not set"); return
+        metrics = self.metrics
+        batch_start = metrics.clock()
+        saved = None  # (cursor, foreground window) from before the first activation
+        done = []
+        try:
+            for target in targets:
+                if cancel.is_set(): break
+                focus = self._needs_focus(target)
+                if focus and saved is None: saved = (self.windows.get_cursor_pos(), self.windows.get_foreground())
+                with metrics.timer('action', target=target.proc_name):
+                    if self._perform_target_actions(target, cancel, focus): done.append(target)
+            if cancel.is_set(): self.status("Action cancelled.")
+            elif done: self.status(f"Actions sent to: {', '.join(t.title for t in done)}")
+        finally:
+            if saved is not None: self._restore_user_focus(*saved)
+            metrics.observe('batch', metrics.clock() - batch_start)
+            metrics.increment('actions_sent', len(done))
+
+    def _restore_user_focus(self, initial_mouse, prev_hwnd: int):
+        with self.metrics.timer('foreground_restore'):
+            if prev_hwnd and self.windows.is_window(prev_hwnd) and self.windows.get_foreground() != prev_hwnd:
+                try: self.windows.set_foreground(prev_hwnd)
+                except WindowError: pass
+        with self.metrics.timer('cursor_restore'):
+            try: self.windows.set_cursor_pos(initial_mouse)
+            except WindowError: pass
+
+    def _perform_target_actions(self, target: Target, cancel: threading.Event, focus: bool = True) -> bool:
+        """Focus one target (if ``focus``) and play its action macro on its own gamepad."""
+        try: timeline = self.action_timeline(target)
+        except macro.MacroError as e:
+            self.status(f"Invalid action for '{target.title}': {e}"); return False
+        pad = self.pool.lease(target.target_id)
+        if pad is None:
+            self.status(f"Gamepad Error: {self.pool.last_error or 'waiting to retry'}. Ensure ViGEmBus driver is installed.")
+            return False
+        if not self._prepare_target_window(target, focus): return False
+        trace = self.trace
+        if trace:
+            action, target_id = next(self._trace_actions), int(target.target_id)
+            pad.trace = lambda state, due: trace.record(action, target_id, state, due)
+        on_phase = lambda phase, seconds: self.metrics.observe(phase, seconds, target=target.proc_name)
+        try:
+            return macro.play(timeline, lambda state, due: self._apply_state(pad, state, due), cancel, on_phase=on_phase)
+        except Exception as e:  # Only the gamepad (its driver or trace hook) runs during playback
+            self.pool.discard(target.target_id)
+            self.status(f"Gamepad error during actions: {e}"); return False
+        finally:
+            if cancel.is_set(): pad.reset(); pad.update()
+            pad.flush()
+            pad.trace = None
+
+    def action_timeline(self, target: Target) -> macro.Timeline:
+        """Compiled action for ``target``: its ``action_macro``, or the built-in turn and A press."""
+        setting = lambda key: target.setting(key, self.settings)
+        text = setting('action_macro').strip() or macro.default_macro(
+            setting('camera_shape'), setting('circle_radius'), setting('action_duration'),
+            setting('circle_loops'), setting('speed_multiplier'))
+        return macro.compile_macro(text)
+
+    @staticmethod
+    def _apply_state(pad: ReportingGamepad, state, due: float):
+        pad.set_state(state); pad.update(due)
+
+    # --------------------------------------------------------------------------
+    # Scheduling
+    # --------------------------------------------------------------------------
+    def _on_deadlines(self, due: List[Hashable]):
+        """Scheduler callback: queue the due targets as one batch on the executor."""
+        if ('reap',) in due:
+            self.pool.reap(); self._schedule_reap()
+        if ('windows',) in due:
+            self._scan_windows()
+        due_ids = [key[1] for key in due if key[0] == 'auto']
+        if not self.toggle or not due_ids: return
+        due_ids = self._gate_on_idle(due_ids)
+        if not due_ids: self._emit_schedule(); return
+        with self._due_lock:
+            self._due_targets.extend(target_id for target_id in due_ids if target_id not in self._due_targets)
+        self.executor.submit('auto')
+        self._emit('queue', stats=self.executor.stats())
+
+    def _gate_on_idle(self, due_ids: List[str]) -> List[str]:
+        """Hold back targets with ``idle_gate`` while the user is active; returns the ids to fire now.
+
+        A held target is rescheduled for the moment the user will have been idle
+        for ``idle_threshold`` seconds, and checked again then. It is never held
+        past ``idle_threshold - IDLE_GATE_MARGIN`` seconds after its last action,
+        so the game still gets input before its AFK kick while the user is busy.
+        """
+        idle, ready, now = None, [], self.scheduler.clock()
+        for target_id in due_ids:
+            target = self.targets.get(target_id)
+            if not target: continue
+            if not target.setting('idle_gate', self.settings): ready.append(target_id); continue
+            if idle is None: idle = self._idle_seconds()
+            threshold = target.setting('idle_threshold', self.settings)
+            latest = target.anchor + max(0.0, threshold - self.IDLE_GATE_MARGIN)
+            if idle < threshold and now >= latest: self.metrics.increment('idle_forced', target=target.proc_name)
+            wait = min(threshold - idle, latest - now)
+            if wait <= 0: ready.append(target_id); continue
+            target.deadline = now + wait
+            self.scheduler.schedule(('auto', target_id), target.deadline)
+            self.metrics.increment('idle_deferred', target=target.proc_name)
+        return ready
+
+    def _idle_seconds(self) -> float:
+        """Seconds since the last user input; infinite (never gate) if it cannot be read."""
+        try:
+            if self.idle is None: self.idle = Win32IdleSource()
+            return self.idle.idle_seconds()
+        except Exception as e:
+            self.status(f"Cannot read user idle time: {e}")
+            return float('inf')
+
+    def _waiting_targets(self) -> List[Target]:
+        """Targets whose window is gone and that may be re-attached to a new one."""
+        return [t for t in self.targets.all()
+                if t.setting('rebind_windows', self.settings) and not self.windows.is_window(t.hwnd)]
+
+    def _schedule_window_scan(self):
+        """Scan for new windows every ``window_scan_interval`` seconds while auto is on and a target is waiting."""
+        if self.toggle and self.scheduler.deadline(('windows',)) is None and self._waiting_targets():
+            self.scheduler.schedule_in(('windows',), self.settings['window_scan_interval'])
+
+    def _scan_windows(self):
+        """Diff the window list into the index and re-attach targets whose window was replaced."""
+        waiting = self._waiting_targets()
+        if not waiting: return
+        with self.metrics.timer('window_scan'):
+            self.window_index.refresh()
+        for target in waiting: self._rebind_target(target)
+        self._schedule_window_scan()
+
+    def _rebind_target(self, target: Target) -> bool:
+        """Point ``target`` at a new window of the same process and title (``rebind_title`` glob).
+
+        Only looks in the window index, which the periodic window scan keeps fresh.
+        """
+        if not target.setting('rebind_windows', self.settings): return False
+        pattern = target.setting('rebind_title', self.settings) or glob.escape(target.title)
+        taken = {t.hwnd for t in self.targets.all()}
+        hwnd = self.window_index.find(target.proc_name, pattern, taken)
+        if hwnd is None or not self.windows.is_window(hwnd): return False  # Not found, or closed since the last scan
+        try: title = self.windows.get_window_text(hwnd)
+        except WindowError: return False
+        self.targets.rebind(target.target_id, hwnd, title)
+        self.metrics.increment('window_rebinds', target=target.proc_name)
+        self.status(f"Re-attached target to the new '{title}' window ({target.proc_name}).")
+        self._emit_targets()
+        return True
+
+    def _schedule_reap(self):
+        """Wake up when the longest-idle gamepad is due to be released."""
+        delay = self.pool.next_reap_delay()
+        if delay is not None: self.scheduler.schedule_in(('reap',), delay)
+
+    def _run_action(self, key: Hashable, cancel: threading.Event):
+        """Executor callback: perform one batch and restart the countdowns of its targets."""
+        if key != 'auto':
+            # 'manual' visits every target, ('manual', ids) only the given ones
+            targets = None if key == 'manual' else [t for t in map(self.targets.get, key[1]) if t]
+            try: self.perform_game_actions(targets, cancel)
+            finally: self._after_action()
+            return
+        with self._due_lock:
+            due_ids, self._due_targets = self._due_targets, []
+        targets = [t for t in map(self.targets.get, due_ids) if t]
+        self._record_lateness(targets)
+        try:
+            self.perform_game_actions(targets, cancel)
+        finally:
+            if self.toggle:
+                for target in targets:
+                    if self.targets.get(target.target_id): self._schedule_auto(target)
+            self._after_action()
+
+    def _after_action(self):
+        self._schedule_reap()
+        self._emit_schedule()
+        self._emit('queue', stats=self.executor.stats())
+        self.export_metrics()
+
+    def _record_lateness(self, targets: List[Target]):
+        """Record how late each target fires relative to its deadline."""
+        now = self.scheduler.clock()
+        for target in targets:
+            lateness = now - target.deadline
+            if lateness >= 0: self.metrics.observe('schedule_lateness', lateness, target=target.proc_name)
+            else: self.metrics.increment('batched_early', target=target.proc_name)  # Pulled forward into a batch
+
+    @property
+    def metrics_dir(self) -> str:
+        # Relative paths are relative to the config directory, like trace_file
+        return os.path.join(os.path.dirname(os.path.abspath(self.config_path)), self.settings['metrics_dir'] or 'metrics')
+
+    def export_metrics(self):
+        """Refresh the gauges and write metrics.json and metrics.prom to ``metrics_dir``."""
+        for name, value in self.executor.stats().items():
+            if isinstance(value, (int, float)): self.metrics.set(f'executor_{name}', float(value))
+        if self.pool:
+            for name, value in self.pool.stats().items(): self.metrics.set(f'gamepad_pool_{name}', value)
+            reports: Dict[str, int] = {}
+            for pad in self.pool.devices():
+                for name, value in pad.stats().items(): reports[name] = reports.get(name, 0) + value
+            for name, value in reports.items(): self.metrics.set(f'gamepad_reports_{name}', value)
+        for name, value in self.hotkey_dispatcher.stats().items(): self.metrics.set(f'hotkeys_{name}', value)
+        try: self.metrics.export(self.metrics_dir)
+        except OSError as e: self.status(f"Error exporting metrics: {e}")
+
+    def _schedule_auto(self, target: Target):
+        """Start a new auto-action countdown for ``target`` from now."""
+        target.anchor = self.scheduler.clock()
+        target.deadline = target.anchor + target.setting('interval', self.settings)
+        self.scheduler.schedule(('auto', target.target_id), target.deadline)
+
+    def seconds_until_fire(self) -> float:
+        """Seconds until the next auto action across all targets."""
+        remaining = [r for r in (self.scheduler.time_until(('auto', t.target_id)) for t in self.targets.all()) if r is not None]
+        return max(0.0, min(remaining)) if remaining else 0.0
+
+    # --------------------------------------------------------------------------
+    # Targets
+    # --------------------------------------------------------------------------
+    def _add_target(self, hwnd: int) -> Target:
+        title, proc_name = self.windows.get_window_text(hwnd), self.windows.get_process_name(hwnd)
+        target = self.targets.add(hwnd, title, proc_name, self.target_overrides.get(proc_name))
+        if self.toggle: self._schedule_auto(target)
+        return target
+
+    def _remove_target(self, target: Target):
+        self.targets.remove(target.target_id); self.scheduler.cancel(('auto', target.target_id))
+        self.pool.release(target.target_id)
+        self._emit_targets(); self._emit_schedule()
+
+    def _clear_targets(self):
+        for target in self.targets.clear():
+            self.scheduler.cancel(('auto', target.target_id)); self.pool.release(target.target_id)
+
+    def add_target(self, hwnd: int) -> Target:
+        """Add window ``hwnd`` as a target. Raises ValueError if there is no such window."""
+        if not self.windows.is_window(hwnd): raise ValueError(f"No window with handle {hwnd}.")
+        target = self._add_target(hwnd)
+        self._emit_targets(); self._emit_schedule()
+        return target
+
+    def remove_target(self, target_id: str) -> bool:
+        target = self.targets.get(target_id)
+        if target: self._remove_target(target)
+        return target is not None
+
+    def clear_targets(self):
+        self._clear_targets()
+        self._emit_targets(); self._emit_schedule()
+
+    def set_target_setting(self, target_id: str, key: str, value: Any):
+        """Override one setting for a single running target (not saved). Raises ValueError if invalid."""
+        self.set_target_settings([target_id], {key: value})
+
+    def set_target_settings(self, target_ids: List[str], values: Dict[str, Any]):
+        """Override settings for running targets (not saved); if anything is invalid, raises ValueError and changes nothing."""
+        targets = [self.targets.get(target_id) for target_id in target_ids]
+        unknown = [target_id for target_id, target in zip(target_ids, targets) if not target]
+        if unknown: raise ValueError(f"Unknown target(s): {', '.join(unknown)}.")
+        valid = {key: self._validate_setting(key, value) for key, value in values.items()}
+        for target in targets:
+            target.settings.update(valid)
+            if 'interval' in valid and self.toggle: self._schedule_auto(target)
+        if 'interval' in valid and self.toggle: self._emit_schedule()
+
+    def set_targets(self, hwnds: List[int]) -> List[Target]:
+        """Replace all targets with windows ``hwnds``; if any window is missing, raises ValueError and changes nothing."""
+        missing = [str(hwnd) for hwnd in hwnds if not self.windows.is_window(hwnd)]
+        if missing: raise ValueError(f"No window with handle(s) {', '.join(missing)}.")
+        self._clear_targets()
+        targets = [self._add_target(hwnd) for hwnd in hwnds]
+        self._emit_targets(); self._emit_schedule()
+        return targets
+
+    # --------------------------------------------------------------------------
+    # User Actions (hotkeys, buttons and other front ends)
+    # --------------------------------------------------------------------------
+    def set_auto(self, on: bool):
+        """Turn auto action on or off."""
+        if on == self.toggle: return
+        self.toggle = on
+        if on:
+            for target in self.targets.all(): self._schedule_auto(target)
+            self._schedule_window_scan()
+            self.status("Auto Action: ON")
+        else:
+            for target in self.targets.all(): self.scheduler.cancel(('auto', target.target_id))
+            with self._due_lock: self._due_targets.clear()  # Never fire them with a later batch
+            self.scheduler.cancel(('windows',))
+            self.executor.cancel()
+            self.status("Auto Action: OFF")
+        self._emit('toggle', on=on)
+        self._emit_schedule()
+
+    def toggle_auto(self):
+        self.set_auto(not self.toggle)
+
+    def manual_action(self, target_ids: Optional[List[str]] = None):
+        """Queue one action for every target, or only for ``target_ids``."""
+        key = 'manual' if target_ids is None else ('manual', tuple(target_ids))
+        if not self.executor.submit(key): self.status("Action queue is full.")
+        self._emit('queue', stats=self.executor.stats())
+
+    def show_time_left(self):
+        message = f"Next action in: {int(self.seconds_until_fire())}s" if self.toggle else "Auto action is OFF"
+        self.status(message); self._emit('show_time', message=message)
+
+    def set_target_window(self, add: bool = False):
+        """Make the foreground window the target, or add it to the targets if ``add``."""
+        try:
+            hwnd = self.windows.get_foreground()
+            if not hwnd: self.status("Could not get foreground window."); return
+            if not add: self._clear_targets()
+            target = self._add_target(hwnd)
+            self.status(f"Target window {'added' if add else 'set to'}: {target.title}")
+        except Exception as e:
+            self.status(f"Error setting window: {e}")
+        self._emit_targets(); self._emit_schedule()
+
+    def add_target_window(self):
+        self.set_target_window(add=True)
+
+    def test_target_detection(self):
+        targets = self.targets.all()
+        for target in targets:
+            if not self.windows.is_window(target.hwnd) and not self._rebind_target(target): self._remove_target(target)
+        alive = self.targets.all()
+        if alive and len(alive) == len(targets):
+            self.status(f"Success! Target is '{alive[0].title}'" if len(alive) == 1 else f"Success! All {len(alive)} targets found.")
+        elif alive:
+            self.status(f"{len(targets) - len(alive)} target(s) closed; {len(alive)} remaining.")
+        else:
+            self.status("Failure: Target window not set or has been closed.")
+        self._emit_targets()
+
+    def request_quit(self):
+        """Ask the front end to shut down."""
+        self.quit_event.set()
+        self._emit('quit')
+
+    # --------------------------------------------------------------------------
+    # Hotkeys
+    # --------------------------------------------------------------------------
+    def hotkey_actions(self) -> Dict[str, Callable[[], None]]:
+        return {'toggle_auto': self.toggle_auto, 'manual_action': self.manual_action, 'show_time': self.show_time_left,
+                'set_window': self.set_target_window, 'add_window': self.add_target_window, 'exit_app': self.request_quit}
+
+    @property
+    def registered_hotkeys(self) -> List[str]:
+        return self.hotkey_dispatcher.registered
+
+    def update_hotkeys(self):
+        """(Re-)register every global hotkey."""
+        bindings = {name: self.hotkeys[name] for name in self.hotkey_actions()}
+        for hotkey, e in self.hotkey_dispatcher.register(bindings).items():
+            self.status(f"Failed to set hotkey '{hotkey}': {e}")
+        self._emit('hotkeys', hotkeys=dict(self.hotkeys))
+
+    def suspend_hotkeys(self):
+        """Unregister the global hotkeys, e.g. while recording a new one."""
+        self.hotkey_dispatcher.unregister()
+
+    def _on_hotkey(self, name: str):
+        """HotkeyDispatcher worker: run the action bound to hotkey ``name``."""
+        self.hotkey_actions()[name]()
+
+    def set_hotkey(self, name: str, hotkey: str):
+        """Rebind hotkey ``name``, persist it and re-register all hotkeys."""
+        self.hotkeys[name] = hotkey
+        self.store.set('Keybinds', name, hotkey); self.update_hotkeys()
+
+
+# ------------------------------------------------------------------------------
+# Headless Entry Point
+# ------------------------------------------------------------------------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="silver's Anti-AFK (headless)")
+    parser.add_argument('--config', metavar='PATH', help="options.ini to use (default: next to this script)")
+    parser.add_argument('--auto', action='store_true', help="start with auto action turned on")
+    parser.add_argument('--ipc-port', type=int, metavar='PORT', help="serve the local control API on this port")
+    parser.add_argument('--startup-report', action='store_true', help="print per-stage startup timings")
+    args = parser.parse_args(argv)
+
+    startup = StartupTimer()
+    core = AntiAfkCore(config_path=args.config, startup=startup)
+    if args.ipc_port is not None: core.settings['ipc_port'] = args.ipc_port
+
+    def on_event(event: str, data: Dict[str, Any]):
+        if event == 'status': print(f"[{time.strftime('%H:%M:%S')}] {data['message']}", flush=True)
+        elif event == 'error':
+            print(f"{data['title']}: {data['message']}", file=sys.stderr, flush=True)
+            if data.get('fatal'): core.request_quit()
+
+    core.subscribe(on_event)
+    core.start()
+    with startup.stage('hotkeys'):
+        core.update_hotkeys()
+    threading.Thread(target=core.check_gamepad_driver, daemon=True).start()
+    if args.startup_report: print(startup.report(), flush=True)
+    if args.auto: core.set_auto(True)
+    try:
+        while not core.quit_event.wait(1.0): pass  # Short waits keep Ctrl+C responsive on Windows
+    except KeyboardInterrupt:
+        pass
+    finally:
+        core.shutdown()
+
+
+if __name__ == '__main__':
+    main()
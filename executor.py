@@ -0,0 +1,113 @@
+# executor.py - Single serialized executor for game actions.
+# All actions run one at a time on one worker thread, so overlapping hotkey
+# presses and auto fires never fight over the gamepad or the foreground window.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+
+class ActionExecutor:
+    """Runs submitted action keys one at a time from a bounded queue.
+
+    A key that is already waiting in the queue is not queued twice; the second
+    request is merged into the first. ``run`` receives the key and a
+    ``threading.Event`` that is set when the action should stop at its next
+    step boundary.
+    """
+
+    def __init__(self, run: Callable[[Hashable, threading.Event], None], maxsize: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        self.run = run
+        self.maxsize = maxsize
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[Hashable, float]" = OrderedDict()  # key -> enqueue time
+        self._current: Optional[Hashable] = None
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stats = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                       'cancelled': 0, 'max_depth': 0, 'wait_total': 0.0, 'wait_max': 0.0, 'wait_last': 0.0}
+
+    # --------------------------------------------------------------------------
+    # Submission and Cancellation
+    # --------------------------------------------------------------------------
+    def submit(self, key: Hashable) -> bool:
+        """Queue ``key`` for execution. Returns False if the queue is full."""
+        with self._cond:
+            if key in self._queue:
+                self._stats['coalesced'] += 1
+                return True
+            if len(self._queue) >= self.maxsize:
+                self._stats['rejected'] += 1
+                return False
+            self._queue[key] = self.clock()
+            self._stats['submitted'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], len(self._queue))
+            self._cond.notify()
+        return True
+
+    def cancel(self, keys: Optional[Iterable[Hashable]] = None):
+        """Stop the in-flight action and drop pending ``keys`` (all if None)."""
+        with self._cond:
+            dropped = list(self._queue) if keys is None else [k for k in keys if k in self._queue]
+            for key in dropped: del self._queue[key]
+            self._stats['cancelled'] += len(dropped)
+            if self._current is not None and not self._cancel_event.is_set():
+                self._cancel_event.set()
+                self._stats['cancelled'] += 1
+
+    @property
+    def current(self) -> Optional[Hashable]:
+        """The key currently being executed, if any."""
+        return self._current
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, wait time and outcome counters."""
+        with self._cond:
+            stats = dict(self._stats, depth=len(self._queue), busy=self._current is not None)
+        started = stats['completed'] + stats['failed'] + (1 if stats['busy'] else 0)
+        stats['wait_avg'] = stats['wait_total'] / started if started else 0.0
+        return stats
+
+    # --------------------------------------------------------------------------
+    # Worker Lifecycle
+    # --------------------------------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._running: return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, name="action-executor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel everything and stop the worker once the current action returns."""
+        self.cancel()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue: self._cond.wait()
+                if not self._running: return
+                key, queued_at = self._queue.popitem(last=False)
+                wait = self.clock() - queued_at
+                self._stats['wait_last'] = wait; self._stats['wait_total'] += wait
+                self._stats['wait_max'] = max(self._stats['wait_max'], wait)
+                self._current = key
+                self._cancel_event = cancel_event = threading.Event()
+            try:
+                self.run(key, cancel_event)
+                outcome = 'completed'
+            except Exception:
+                outcome = 'failed'
+            with self._cond:
+                self._stats[outcome] += 1
+                self._current = None
@@ -0,0 +1,319 @@
+# gamepad.py - Virtual gamepad report layer and device pool.
+# Keeps the desired controller state and only pushes a report to the driver
+# when that state changed, never faster than the configured report rate.
+# Controllers are created lazily and leased to targets from a DevicePool.
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# (buttons, left_x, left_y, right_x, right_y, left_trigger, right_trigger)
+State = Tuple[int, float, float, float, float, float, float]
+NEUTRAL: State = (0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+class ReportingGamepad:
+    """Wraps a ``vg.VX360Gamepad`` and coalesces its ``update()`` calls.
+
+    The setters mirror the vgamepad API but only change the desired state.
+    ``update()`` sends a report if the state differs from the last one sent and
+    the report interval has elapsed; otherwise the change is left pending and a
+    background flusher sends it at the start of the next tick, merged with any
+    other change made in the meantime. The flusher exits once nothing has been
+    pending for ``FLUSHER_LINGER`` seconds and is restarted on demand.
+
+    If ``trace`` is set, it is called as ``trace(state, due)`` for every report
+    actually sent, where ``due`` is when the caller wanted the state applied.
+    A report that fails on the flusher thread is counted and kept in
+    ``last_error``; the next ``update()`` tries again.
+    """
+
+    FLUSHER_LINGER = 1.0
+
+    def __init__(self, device, rate: float = 250, clock: Callable[[], float] = time.monotonic):
+        self.device = device
+        self.rate = rate
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._state = list(NEUTRAL)
+        self._sent: Optional[State] = NEUTRAL  # None while the device state is unknown
+        self._pending = False
+        self._next_allowed = 0.0
+        self._due: Optional[float] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self.trace: Optional[Callable[[State, float], None]] = None
+        self.reports_sent = 0
+        self.reports_skipped = 0
+        self.reports_merged = 0
+        self.reports_failed = 0
+        self.last_error: Optional[Exception] = None
+
+    # --------------------------------------------------------------------------
+    # vgamepad-compatible Setters
+    # --------------------------------------------------------------------------
+    def press_button(self, button):
+        with self._cond: self._state[0] |= int(button)
+
+    def release_button(self, button):
+        with self._cond: self._state[0] &= ~int(button)
+
+    def left_joystick_float(self, x_value_float: float, y_value_float: float):
+        with self._cond: self._state[1:3] = [x_value_float, y_value_float]
+
+    def right_joystick_float(self, x_value_float: float, y_value_float: float):
+        with self._cond: self._state[3:5] = [x_value_float, y_value_float]
+
+    def left_trigger_float(self, value_float: float):
+        with self._cond: self._state[5] = value_float
+
+    def right_trigger_float(self, value_float: float):
+        with self._cond: self._state[6] = value_float
+
+    def reset(self):
+        with self._cond: self._state = list(NEUTRAL)
+
+    def set_state(self, state: State):
+        """Replace the whole pending state at once (buttons, sticks and triggers)."""
+        with self._cond: self._state = list(state)
+
+    @property
+    def state(self) -> State:
+        with self._cond: return tuple(self._state)
+
+    # --------------------------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------------------------
+    @property
+    def report_interval(self) -> float:
+        return 1.0 / self.rate if self.rate > 0 else 0.0
+
+    def update(self, due: Optional[float] = None):
+        """Request a report for the current state; sent now or on the next tick.
+
+        ``due`` is the (``clock``) time the state was scheduled for, for tracing.
+        """
+        with self._cond:
+            if self._closed: return
+            self._due = due
+            if tuple(self._state) == self._sent:
+                if self._pending:  # A pending change was undone before it went out
+                    self._pending = False; self.reports_merged += 1
+                else:
+                    self.reports_skipped += 1
+                return
+            if self._pending:
+                self.reports_merged += 1
+                return
+            if self.clock() >= self._next_allowed:
+                self._send()
+                return
+            self._pending = True
+            self._ensure_flusher()
+            self._cond.notify()
+
+    def flush(self):
+        """Block until any pending change has been sent to the device."""
+        with self._cond:
+            if not self._pending or self._closed: return
+            delay = self._next_allowed - self.clock()
+        if delay > 0: time.sleep(delay)
+        with self._cond:
+            if self._pending and not self._closed: self._send()
+
+    def close(self):
+        """Stop the flusher and drop the device; later updates are ignored."""
+        with self._cond:
+            self._closed, self._pending = True, False
+            flusher, self.device = self._flusher, None
+            self._cond.notify_all()
+        if flusher and flusher is not threading.current_thread(): flusher.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Return report counters: sent, skipped (no change), merged (same tick) and failed."""
+        with self._cond:
+            return {'sent': self.reports_sent, 'skipped': self.reports_skipped, 'merged': self.reports_merged,
+                    'failed': self.reports_failed}
+
+    def _send(self):
+        """Push the desired state to the device. Caller holds the lock.
+
+        Whether or not the device raises, the change is no longer pending. After
+        a failure the device state is unknown, so the next report sets every field.
+        """
+        state = tuple(self._state)
+        sent, device = self._sent, self.device
+        self._sent = None
+        try:
+            if sent is None:  # Set every button and axis
+                sent, pressed, released = (0,) + (math.nan,) * 6, state[0], 0xFFFF & ~state[0]
+            else:
+                pressed, released = state[0] & ~sent[0], sent[0] & ~state[0]
+            if pressed: device.press_button(button=pressed)
+            if released: device.release_button(button=released)
+            if state[1:3] != sent[1:3]: device.left_joystick_float(x_value_float=state[1], y_value_float=state[2])
+            if state[3:5] != sent[3:5]: device.right_joystick_float(x_value_float=state[3], y_value_float=state[4])
+            if state[5] != sent[5]: device.left_trigger_float(value_float=state[5])
+            if state[6] != sent[6]: device.right_trigger_float(value_float=state[6])
+            device.update()
+        finally:
+            self._pending = False
+            self._next_allowed = self.clock() + self.report_interval
+        self._sent = state
+        self.reports_sent += 1
+        if self.trace: self.trace(state, self.clock() if self._due is None else self._due)
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="gamepad-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        with self._cond:
+            try:
+                while not self._closed:
+                    if not self._pending:
+                        self._cond.wait(self.FLUSHER_LINGER)
+                        if not self._pending: break  # Idle: let the thread (and its reference to us) go
+                        continue
+                    delay = self._next_allowed - self.clock()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    try: self._send()
+                    except Exception as e:  # Nobody to raise to on this thread; keep flushing
+                        self.reports_failed += 1; self.last_error = e
+            finally:
+                self._flusher = None
+
+
+class FakeGamepad:
+    """Stand-in for ``vg.VX360Gamepad`` that records every report it is sent."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._state = list(NEUTRAL)
+        self.reports: List[Tuple[float, State]] = []
+
+    def press_button(self, button): self._state[0] |= int(button)
+    def release_button(self, button): self._state[0] &= ~int(button)
+    def left_joystick_float(self, x_value_float: float, y_value_float: float): self._state[1:3] = [x_value_float, y_value_float]
+    def right_joystick_float(self, x_value_float: float, y_value_float: float): self._state[3:5] = [x_value_float, y_value_float]
+    def left_trigger_float(self, value_float: float): self._state[5] = value_float
+    def right_trigger_float(self, value_float: float): self._state[6] = value_float
+    def reset(self): self._state = list(NEUTRAL)
+    def set_state(self, state: State): self._state = list(state)
+    def update(self, due: Optional[float] = None): self.reports.append((self.clock(), tuple(self._state)))
+
+
+class _Slot:
+    __slots__ = ('device', 'last_used')
+
+    def __init__(self, device, last_used: float):
+        self.device, self.last_used = device, last_used
+
+
+class DevicePool:
+    """Lazily created, leased and reused virtual controllers.
+
+    Each owner (a target id) leases its own device on first use and keeps it
+    until it is released or sits unused for ``idle_timeout`` seconds. Released
+    devices are reused by the next owner before a new one is created. When the
+    factory fails, creation is retried with exponential backoff.
+    """
+
+    def __init__(self, factory: Callable[[], Any], idle_timeout: float = 600.0,
+                 retry_base: float = 1.0, retry_max: float = 60.0,
+                 close: Optional[Callable[[Any], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.retry_base, self.retry_max = retry_base, retry_max
+        self.close_device = close
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._leases: Dict[Hashable, _Slot] = {}
+        self._free: List[_Slot] = []
+        self._failures = 0
+        self._retry_at = 0.0
+        self.last_error: Optional[Exception] = None
+        self._stats = {'created': 0, 'reused': 0, 'failed': 0, 'reaped': 0}
+
+    def lease(self, owner: Hashable):
+        """Return ``owner``'s device, creating or reusing one if needed.
+
+        Returns None while creation is backing off after a failure.
+        """
+        with self._lock:
+            now = self.clock()
+            slot = self._leases.get(owner)
+            if slot is None and self._free:
+                slot = self._leases[owner] = self._free.pop()
+                self._stats['reused'] += 1
+            if slot is None:
+                if now < self._retry_at: return None
+                try:
+                    device = self.factory()
+                except Exception as e:
+                    self.last_error = e
+                    self._failures += 1; self._stats['failed'] += 1
+                    self._retry_at = now + min(self.retry_max, self.retry_base * 2 ** (self._failures - 1))
+                    return None
+                self._failures, self._retry_at, self.last_error = 0, 0.0, None
+                slot = self._leases[owner] = _Slot(device, now)
+                self._stats['created'] += 1
+            slot.last_used = now
+            return slot.device
+
+    def release(self, owner: Hashable):
+        """Return ``owner``'s device to the pool for reuse."""
+        with self._lock:
+            slot = self._leases.pop(owner, None)
+            if slot:
+                slot.last_used = self.clock()
+                self._free.append(slot)
+
+    def discard(self, owner: Hashable):
+        """Drop ``owner``'s device after it failed; the next lease re-creates it."""
+        with self._lock: slot = self._leases.pop(owner, None)
+        if slot: self._close(slot)
+
+    def reap(self) -> int:
+        """Close every device unused for ``idle_timeout`` seconds; returns how many."""
+        with self._lock:
+            cutoff = self.clock() - self.idle_timeout
+            idle = [owner for owner, slot in self._leases.items() if slot.last_used <= cutoff]
+            reaped = [self._leases.pop(owner) for owner in idle]
+            reaped += [slot for slot in self._free if slot.last_used <= cutoff]
+            self._free = [slot for slot in self._free if slot.last_used > cutoff]
+            self._stats['reaped'] += len(reaped)
+        for slot in reaped: self._close(slot)
+        return len(reaped)
+
+    def next_reap_delay(self) -> Optional[float]:
+        """Seconds until the oldest idle device becomes reapable, or None if the pool is empty."""
+        with self._lock:
+            slots = list(self._leases.values()) + self._free
+            if not slots: return None
+            return max(0.0, min(slot.last_used for slot in slots) + self.idle_timeout - self.clock())
+
+    def devices(self) -> List[Any]:
+        """Every live device, leased or free."""
+        with self._lock: return [slot.device for slot in list(self._leases.values()) + self._free]
+
+    def close(self):
+        """Close every device in the pool."""
+        with self._lock:
+            slots = list(self._leases.values()) + self._free
+            self._leases.clear(); self._free.clear()
+        for slot in slots: self._close(slot)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, leased=len(self._leases), free=len(self._free))
+
+    def _close(self, slot: _Slot):
+        if self.close_device:
+            try: self.close_device(slot.device)
+            except Exception: pass
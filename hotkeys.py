@@ -0,0 +1,140 @@
+# hotkeys.py - Global hotkeys dispatched off the keyboard hook thread.
+# Hook callbacks only queue the hotkey's name and return, so a slow action
+# (window lookups, process queries) never holds up keystrokes system-wide;
+# a worker thread runs the bound actions in order.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from startup import lazy_import
+
+keyboard = lazy_import('keyboard')
+
+
+class HotkeyBackend:
+    """Interface for registering global hotkeys."""
+
+    def add_hotkey(self, hotkey: str, callback: Callable[[], None]) -> Any: raise NotImplementedError
+    def remove_hotkey(self, handle: Any): raise NotImplementedError
+
+
+class KeyboardBackend(HotkeyBackend):
+    """HotkeyBackend on top of the ``keyboard`` package (imported on first use)."""
+
+    def add_hotkey(self, hotkey: str, callback: Callable[[], None]) -> Any: return keyboard.add_hotkey(hotkey, callback)
+    def remove_hotkey(self, handle: Any): keyboard.remove_hotkey(handle)
+
+
+class FakeHotkeyBackend(HotkeyBackend):
+    """In-memory hotkeys for tests and benchmarks; ``press`` plays the hook thread."""
+
+    def __init__(self):
+        self.hotkeys: Dict[str, Callable[[], None]] = {}
+
+    def add_hotkey(self, hotkey: str, callback: Callable[[], None]) -> Any:
+        if not hotkey: raise ValueError("Empty hotkey")
+        self.hotkeys[hotkey] = callback
+        return hotkey
+
+    def remove_hotkey(self, handle: Any):
+        del self.hotkeys[handle]
+
+    def press(self, hotkey: str):
+        self.hotkeys[hotkey]()
+
+
+class HotkeyDispatcher:
+    """Registers hotkeys whose callbacks only enqueue; ``handler(name)`` runs on a worker.
+
+    A name that is already waiting is not queued twice, and at most ``maxsize``
+    names wait at once. The time spent inside each hook callback is recorded as
+    the 'hotkey_callback' metric and the queueing delay as 'hotkey_dispatch'.
+    """
+
+    def __init__(self, handler: Callable[[str], None], backend: Optional[HotkeyBackend] = None, metrics=None,
+                 maxsize: int = 16, clock: Callable[[], float] = time.perf_counter,
+                 on_error: Optional[Callable[[str, Exception], None]] = None):
+        self.handler = handler
+        self.backend = backend or KeyboardBackend()
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self.clock = clock
+        self.on_error = on_error
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[str, float]" = OrderedDict()  # name -> press time
+        self._handles: Dict[str, Any] = {}  # hotkey -> backend handle
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stats = {'pressed': 0, 'coalesced': 0, 'dropped': 0, 'handled': 0, 'failed': 0}
+
+    # --------------------------------------------------------------------------
+    # Registration
+    # --------------------------------------------------------------------------
+    def register(self, bindings: Dict[str, str]) -> Dict[str, Exception]:
+        """Replace all hotkeys with ``bindings`` (name -> hotkey); returns the ones that failed."""
+        self.unregister()
+        failures = {}
+        for name, hotkey in bindings.items():
+            try: self._handles[hotkey] = self.backend.add_hotkey(hotkey, lambda name=name: self._on_hook(name))
+            except Exception as e: failures[hotkey] = e
+        return failures
+
+    def unregister(self):
+        for handle in self._handles.values():
+            try: self.backend.remove_hotkey(handle)
+            except Exception: pass
+        self._handles.clear()
+
+    @property
+    def registered(self) -> List[str]:
+        return list(self._handles)
+
+    def _on_hook(self, name: str):
+        """Runs on the keyboard hook thread: queue ``name`` and return at once."""
+        start = self.clock()
+        with self._cond:
+            self._stats['pressed'] += 1
+            if name in self._queue: self._stats['coalesced'] += 1
+            elif len(self._queue) >= self.maxsize: self._stats['dropped'] += 1
+            else: self._queue[name] = start; self._cond.notify()
+        if self.metrics: self.metrics.observe('hotkey_callback', self.clock() - start)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond: return dict(self._stats, pending=len(self._queue))
+
+    # --------------------------------------------------------------------------
+    # Worker Lifecycle
+    # --------------------------------------------------------------------------
+    def start(self):
+        with self._cond:
+            if self._running: return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, name="hotkey-dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Unregister all hotkeys and stop the worker, dropping pending presses."""
+        self.unregister()
+        with self._cond:
+            self._running = False
+            self._queue.clear()
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread(): self._thread.join()
+        self._thread = None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue: self._cond.wait()
+                if not self._running: return
+                name, pressed_at = self._queue.popitem(last=False)
+            if self.metrics: self.metrics.observe('hotkey_dispatch', self.clock() - pressed_at, hotkey=name)
+            try:
+                self.handler(name)
+                outcome = 'handled'
+            except Exception as e:
+                outcome = 'failed'
+                if self.on_error: self.on_error(name, e)
+            with self._cond: self._stats[outcome] += 1
@@ -0,0 +1,38 @@
+# idle.py - Sources for how long the user has been away from the machine.
+# Used to hold auto actions back while someone is actively using the computer.
+
+import time
+from typing import Callable
+
+
+class IdleSource:
+    """Interface: seconds since the last keyboard or mouse input."""
+
+    def idle_seconds(self) -> float: raise NotImplementedError
+
+
+class Win32IdleSource(IdleSource):
+    """IdleSource on top of GetLastInputInfo (session-wide keyboard and mouse input)."""
+
+    def __init__(self):
+        import win32api
+        self.win32api = win32api
+
+    def idle_seconds(self) -> float:
+        # Both values are 32-bit millisecond tick counts, so mask the difference to survive wrap-around
+        elapsed = (self.win32api.GetTickCount() - self.win32api.GetLastInputInfo()) & 0xFFFFFFFF
+        return elapsed / 1000.0
+
+
+class FakeIdleSource(IdleSource):
+    """Idle source for tests and benchmarks; call ``touch`` to simulate user input."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.last_input = clock()
+
+    def touch(self):
+        self.last_input = self.clock()
+
+    def idle_seconds(self) -> float:
+        return max(0.0, self.clock() - self.last_input)
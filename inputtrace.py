@@ -0,0 +1,196 @@
+# inputtrace.py - Binary trace of the reports sent to the virtual gamepads.
+# Fixed-size records go into a preallocated, memory-mapped ring file, so
+# recording is a struct.pack_into per report. The reader maps the same file
+# for offline timing analysis, and the replayer feeds a trace into a device.
+#
+# Usage: python inputtrace.py analyze trace.bin
+#        python inputtrace.py dump trace.bin
+
+import argparse
+import json
+import mmap
+import os
+import statistics
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from gamepad import State
+
+MAGIC = b'AFKTRACE'
+VERSION = 1
+# magic, version, record size, capacity, records written (total, including overwritten)
+HEADER = struct.Struct('<8sHHIQ')
+HEADER_SIZE = 32
+# monotonic time sent, time due, action number, target id, buttons, lx, ly, rx, ry, lt, rt
+RECORD = struct.Struct('<ddIIH6f')
+_COUNT_OFFSET = 16  # Offset of the records-written field in the header
+
+
+class TraceError(Exception):
+    """Raised when a trace file is missing, truncated or in an unknown format."""
+
+
+class TraceRecord(NamedTuple):
+    time: float
+    due: float
+    action: int
+    target: int
+    state: State
+
+    @property
+    def drift(self) -> float:
+        """How late the report went out relative to when it was scheduled."""
+        return self.time - self.due
+
+
+def _file_size(capacity: int) -> int:
+    return HEADER_SIZE + capacity * RECORD.size
+
+
+# ------------------------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------------------------
+class TraceWriter:
+    """Appends records to a ring of ``capacity`` slots in ``path``, overwriting the oldest.
+
+    A missing file is created exclusively. An existing trace with the same
+    capacity is continued, and one with another capacity is restarted. Any other
+    existing file is left alone and TraceError is raised.
+    """
+
+    def __init__(self, path: str, capacity: int = 65536, clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.capacity = capacity
+        self.clock = clock
+        self._lock = threading.Lock()
+        size = _file_size(capacity)
+        count = 0
+        try:
+            self._file = open(path, 'x+b')
+        except FileExistsError:
+            if os.path.getsize(path):  # An empty file has nothing to lose
+                try: reader = TraceReader(path)
+                except TraceError as e: raise TraceError(f"Not overwriting {path}: {e}") from None
+                if reader.capacity == capacity: count = reader.count
+                reader.close()
+            self._file = open(path, 'r+b')
+        try:
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        except BaseException:
+            self._file.close()
+            raise
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, capacity, count)
+        self.count = count
+
+    def record(self, action: int, target: int, state: State, due: float):
+        with self._lock:
+            offset = HEADER_SIZE + (self.count % self.capacity) * RECORD.size
+            RECORD.pack_into(self._map, offset, self.clock(), due, action, target, *state)
+            self.count += 1
+            struct.pack_into('<Q', self._map, _COUNT_OFFSET, self.count)
+
+    def flush(self):
+        with self._lock: self._map.flush()
+
+    def close(self):
+        with self._lock:
+            if self._map.closed: return
+            self._map.flush(); self._map.close(); self._file.close()
+
+
+# ------------------------------------------------------------------------------
+# Reading and Analysis
+# ------------------------------------------------------------------------------
+class TraceReader:
+    """Memory-mapped, read-only view of a trace file, oldest record first."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._map: Optional[mmap.mmap] = None
+        try:
+            if os.fstat(self._file.fileno()).st_size < HEADER_SIZE: raise TraceError(f"{path} is too short for a trace")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        magic, version, record_size, self.capacity, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise TraceError(f"{path} is not a version {VERSION} input trace")
+        if len(self._map) < _file_size(self.capacity):
+            self.close()
+            raise TraceError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        first = self.count - len(self)
+        for i in range(first, self.count):
+            t, due, action, target, *state = RECORD.unpack_from(self._map, HEADER_SIZE + (i % self.capacity) * RECORD.size)
+            yield TraceRecord(t, due, action, target, tuple(state))
+
+    def close(self):
+        if self._map is not None and not self._map.closed: self._map.close()
+        self._file.close()
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values: return {}
+    return {'mean': statistics.fmean(values), 'max': max(values), 'min': min(values),
+            'stdev': statistics.pstdev(values)}
+
+
+def analyze(records: List[TraceRecord]) -> Dict[str, object]:
+    """Step spacing, duration and drift, per action (and target) and overall."""
+    actions: Dict[tuple, List[TraceRecord]] = {}
+    for record in records: actions.setdefault((record.action, record.target), []).append(record)
+    per_action = []
+    for (action, target), group in actions.items():
+        spacing = [b.time - a.time for a, b in zip(group, group[1:])]
+        per_action.append({'action': action, 'target': target, 'reports': len(group),
+                           'duration': group[-1].time - group[0].time,
+                           'planned_duration': group[-1].due - group[0].due,
+                           'spacing': _summary(spacing), 'drift': _summary([r.drift for r in group])})
+    drift = [r.drift for r in records]
+    return {'records': len(records), 'actions': len(per_action),
+            'duration': _summary([a['duration'] for a in per_action]),
+            'duration_error': _summary([a['duration'] - a['planned_duration'] for a in per_action]),
+            'drift': _summary(drift), 'per_action': per_action}
+
+
+# ------------------------------------------------------------------------------
+# Replay
+# ------------------------------------------------------------------------------
+def replay(records: List[TraceRecord], device, speed: float = 1.0, clock: Callable[[], float] = time.monotonic,
+           sleep: Callable[[float], None] = time.sleep):
+    """Send the traced states to ``device`` (e.g. a FakeGamepad) with their original spacing."""
+    if not records: return device
+    start, origin = clock(), records[0].time
+    for record in records:
+        remaining = start + (record.time - origin) / speed - clock()
+        if remaining > 0: sleep(remaining)
+        device.set_state(record.state); device.update()
+    return device
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect an Anti-AFK input trace")
+    parser.add_argument('command', choices=('analyze', 'dump'))
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+    reader = TraceReader(args.path)
+    try:
+        if args.command == 'dump':
+            for r in reader: print(f"{r.time:.6f} due={r.due:.6f} action={r.action} target={r.target} state={r.state}")
+        else:
+            print(json.dumps(analyze(list(reader)), indent=2))
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# ipc.py - Local control API: line-delimited JSON over a loopback TCP socket.
+# Lets scripts and orchestrators drive a running instance without hotkeys.
+# Every line sent is one request object, or a JSON array of them to batch
+# several commands in one round trip; every reply is one line in the same shape.
+#
+#   {"cmd": "status"}
+#   {"cmd": "toggle", "on": true}
+#   {"cmd": "manual", "targets": ["1", "3"]}
+#   {"cmd": "settings", "values": {"interval": 30}, "targets": ["1", "2"]}
+#   [{"cmd": "add_targets", "hwnds": [131844]}, {"cmd": "metrics"}]
+#
+# Replies are {"ok": true, "result": ...} or {"ok": false, "error": "..."},
+# with the request's "id" echoed back when it has one. Every request must carry
+# the instance's ipc_token as "token". A line that is not JSON (e.g. an HTTP
+# request from a web page) closes the connection.
+
+import argparse
+import configparser
+import json
+import ntpath
+import os
+import re
+import secrets
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+Request = Dict[str, Any]
+
+HTTP_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'CONNECT', 'OPTIONS', 'TRACE', 'PATCH')
+# Settings naming files; over the API they must stay relative to the config directory
+PATH_SETTINGS = ('trace_file', 'metrics_dir')
+PRIVATE_SETTINGS = ('ipc_token',)
+
+
+def _check_path_setting(key: str, value: Any):
+    path = str(value)
+    if ntpath.splitdrive(path)[0] or path.startswith(('/', '\\')) or '..' in re.split(r'[\\/]', path):
+        raise ValueError(f"{key} must be a relative path without '..' when set over the control API.")
+
+
+class ControlServer:
+    """Serves the control API for ``core`` on 127.0.0.1:``port`` (0 picks a free port).
+
+    Every request must carry ``token`` as ``"token"``.
+    """
+
+    def __init__(self, core, port: int = 0, token: str = '', host: str = '127.0.0.1'):
+        if not token: raise ValueError("The control API needs a token.")
+        self.core = core
+        self.token = token
+        self.commands: Dict[str, Callable[[Request], Any]] = {
+            'status': self._status, 'metrics': self._metrics, 'toggle': self._toggle, 'manual': self._manual,
+            'settings': self._settings, 'add_targets': self._add_targets, 'remove_targets': self._remove_targets,
+            'set_targets': self._set_targets, 'quit': self._quit,
+        }
+        self._server = _Server((host, port), _Handler)
+        self._server.control = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ipc-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown(); self._server.server_close()
+        if self._thread: self._thread.join()
+        self._thread = None
+
+    # --------------------------------------------------------------------------
+    # Dispatch
+    # --------------------------------------------------------------------------
+    def handle_line(self, line: str) -> Optional[str]:
+        """Answer one protocol line (a request object or a batch array); None if it is not JSON."""
+        if line.split(' ', 1)[0] in HTTP_METHODS: return None
+        try: message = json.loads(line)
+        except ValueError: return None
+        if isinstance(message, list): return json.dumps([self.handle(request) for request in message])
+        return json.dumps(self.handle(message))
+
+    def handle(self, request: Request) -> Dict[str, Any]:
+        reply: Dict[str, Any] = {}
+        if isinstance(request, dict) and 'id' in request: reply['id'] = request['id']
+        try:
+            if not isinstance(request, dict): raise ValueError("A request must be a JSON object.")
+            if not secrets.compare_digest(str(request.get('token', '')).encode(), self.token.encode()):
+                raise PermissionError("Invalid token.")
+            command = self.commands.get(request.get('cmd'))
+            if command is None: raise ValueError(f"Unknown command {request.get('cmd')!r}.")
+            reply.update(ok=True, result=command(request))
+            self.core.metrics.increment('ipc_requests', cmd=request['cmd'])
+        except Exception as e:
+            reply.update(ok=False, error=str(e))
+            self.core.metrics.increment('ipc_errors')
+        return reply
+
+    def _target_ids(self, request: Request) -> Optional[List[str]]:
+        """The request's "targets" as a list of ids; None (all targets) if it is missing or "all"."""
+        ids = request.get('targets', 'all')
+        if ids == 'all': return None
+        if not isinstance(ids, list): raise ValueError('"targets" must be a list of target ids or "all".')
+        ids = [str(i) for i in ids]
+        unknown = [i for i in ids if self.core.targets.get(i) is None]
+        if unknown: raise ValueError(f"Unknown target(s): {', '.join(unknown)}.")
+        return ids
+
+    # --------------------------------------------------------------------------
+    # Commands
+    # --------------------------------------------------------------------------
+    def _public_settings(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.core.settings.items() if k not in PRIVATE_SETTINGS}
+
+    def _status(self, request: Request) -> Dict[str, Any]:
+        core = self.core
+        targets = [{'id': t.target_id, 'hwnd': t.hwnd, 'title': t.title, 'proc_name': t.proc_name,
+                    'settings': dict(t.settings), 'remaining': core.scheduler.time_until(('auto', t.target_id))}
+                   for t in core.targets.all()]
+        return {'auto': core.toggle, 'remaining': core.seconds_until_fire() if core.toggle else None,
+                'targets': targets, 'queue': core.executor.stats(),
+                'settings': self._public_settings()}
+
+    def _metrics(self, request: Request) -> Dict[str, Any]:
+        return self.core.metrics.snapshot()
+
+    def _toggle(self, request: Request) -> bool:
+        on = request.get('on')
+        if on is not None and not isinstance(on, bool): raise ValueError('"on" must be true or false.')
+        self.core.set_auto(not self.core.toggle if on is None else bool(on))
+        return self.core.toggle
+
+    def _manual(self, request: Request) -> bool:
+        self.core.manual_action(self._target_ids(request))
+        return True
+
+    def _settings(self, request: Request) -> Dict[str, Any]:
+        values = request.get('values')
+        if not isinstance(values, dict) or not values: raise ValueError('"values" must be an object of settings.')
+        for key in PATH_SETTINGS:
+            if key in values: _check_path_setting(key, values[key])
+        if 'targets' not in request:  # Global settings, saved to options.ini
+            self.core.set_settings(values)
+            return self._public_settings()
+        ids = self._target_ids(request)
+        if ids is None: ids = [t.target_id for t in self.core.targets.all()]
+        self.core.set_target_settings(ids, values)
+        return {target_id: dict(self.core.targets.get(target_id).settings) for target_id in ids}
+
+    def _hwnds(self, request: Request) -> List[int]:
+        """The request's "hwnds", checked to all be open windows."""
+        hwnds = request.get('hwnds')
+        if not isinstance(hwnds, list) or not all(isinstance(h, int) and not isinstance(h, bool) for h in hwnds):
+            raise ValueError('"hwnds" must be a list of window handles.')
+        missing = [str(hwnd) for hwnd in hwnds if not self.core.windows.is_window(hwnd)]
+        if missing: raise ValueError(f"No window with handle(s) {', '.join(missing)}.")
+        return hwnds
+
+    def _add_targets(self, request: Request) -> List[str]:
+        return [self.core.add_target(hwnd).target_id for hwnd in self._hwnds(request)]
+
+    def _remove_targets(self, request: Request) -> List[str]:
+        ids = self._target_ids(request)
+        if ids is None: ids = [t.target_id for t in self.core.targets.all()]
+        return [target_id for target_id in ids if self.core.remove_target(target_id)]
+
+    def _set_targets(self, request: Request) -> List[str]:
+        return [target.target_id for target in self.core.set_targets(self._hwnds(request))]
+
+    def _quit(self, request: Request) -> bool:
+        self.core.request_quit()
+        return True
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').strip()
+            if not line: continue
+            reply = self.server.control.handle_line(line)
+            if reply is None:  # Not a client of this protocol (e.g. a browser form post): drop it
+                self.server.control.core.metrics.increment('ipc_errors')
+                self.wfile.write(b'{"ok": false, "error": "Invalid JSON, closing the connection."}\n')
+                return
+            self.wfile.write((reply + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+
+# ------------------------------------------------------------------------------
+# Client
+# ------------------------------------------------------------------------------
+def send(port: int, message: Any, token: Optional[str] = None, host: str = '127.0.0.1', timeout: float = 5.0) -> Any:
+    """Send one request (or a list of them) and return the decoded reply.
+
+    ``token`` is added to every request that does not carry one.
+    """
+    if token:
+        for request in message if isinstance(message, list) else [message]:
+            if isinstance(request, dict): request.setdefault('token', token)
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+        with sock.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+
+def read_token(config_path: str) -> str:
+    """The ipc_token saved in an options.ini ('' if there is none)."""
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(config_path)
+    return parser.get('Settings', 'ipc_token', fallback='')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Send a command to a running silver's Anti-AFK instance")
+    parser.add_argument('port', type=int, help="the instance's ipc_port")
+    parser.add_argument('request', help='JSON request, e.g. \'{"cmd": "status"}\'')
+    parser.add_argument('--token', help="the instance's ipc_token (default: read from --config)")
+    parser.add_argument('--config', metavar='PATH', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'options.ini'),
+                        help="options.ini to read the token from (default: next to this script)")
+    args = parser.parse_args(argv)
+    token = args.token or read_token(args.config)
+    print(json.dumps(send(args.port, json.loads(args.request), token), indent=2))
+
+
+if __name__ == '__main__':
+    main()
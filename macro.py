@@ -0,0 +1,265 @@
+# macro.py - Small action language compiled into controller-state timelines.
+# A macro such as "turn circle 0.8 1.0; wait 0.1; tap A" is compiled once into
+# a flat list of (offset, state) steps and cached until its text changes;
+# playback is a single loop pacing those steps against absolute deadlines.
+#
+# Statements (separated by ';' or new lines):
+#   turn [shape] [radius] [duration] [loops] [left|right]   camera trajectory
+#   stick <left|right> <x> <y> [seconds]                     set a stick (and hold)
+#   trigger <left|right> <value> [seconds]                   set a trigger (and hold)
+#   tap <button> [seconds=0.1]    hold <button> <seconds>    press/release a button
+#   press <button>                release <button>           change a button only
+#   wait <seconds>                neutral                    pause / reset everything
+#   repeat <n> { ... }                                       repeat a block
+#
+# Stick values are in [-1, 1], trigger values and the turn radius in [0, 1].
+
+import math
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import trajectory
+from gamepad import NEUTRAL, State
+
+BUTTONS = {
+    'UP': 0x0001, 'DOWN': 0x0002, 'LEFT': 0x0004, 'RIGHT': 0x0008,
+    'START': 0x0010, 'BACK': 0x0020, 'LS': 0x0040, 'RS': 0x0080,
+    'LB': 0x0100, 'RB': 0x0200, 'GUIDE': 0x0400,
+    'A': 0x1000, 'B': 0x2000, 'X': 0x4000, 'Y': 0x8000,
+}
+
+# Metric phase reported for each statement type
+PHASES = {'turn': 'camera_turn', 'tap': 'button_press', 'hold': 'button_press', 'press': 'button_press',
+          'release': 'button_press', 'stick': 'stick', 'trigger': 'trigger', 'wait': 'wait', 'neutral': 'neutral'}
+
+# Maximum number of arguments per statement
+ARITY = {'turn': 5, 'stick': 4, 'trigger': 3, 'tap': 2, 'hold': 2, 'press': 1, 'release': 1,
+         'wait': 1, 'neutral': 0, 'repeat': 2}
+
+# Upper bound on compiled steps (and statements run), so "repeat 1e9 { ... }" fails fast
+MAX_STEPS = 100_000
+
+_TOKEN = re.compile(r"[ \t\r]*(?:([{};\n])|([^\s{};]+))")
+
+
+class MacroError(ValueError):
+    """Raised when a macro cannot be parsed."""
+
+
+class Step(NamedTuple):
+    offset: float
+    state: State
+    phase: str
+
+
+class Timeline(NamedTuple):
+    steps: Tuple[Step, ...]
+    duration: float
+
+
+def default_macro(shape: str, radius: float, duration: float, loops: int, speed_multiplier: float) -> str:
+    """The built-in action: one camera turn, a short pause, then a tap of A."""
+    return f"turn {shape} {radius} {duration} {loops}; wait {0.1 * speed_multiplier}; tap A 0.1"
+
+
+# ------------------------------------------------------------------------------
+# Parsing
+# ------------------------------------------------------------------------------
+def _tokenize(text: str) -> List[str]:
+    tokens, pos = [], 0
+    text = re.sub(r"#[^\n]*", "", text)
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match: break  # Only trailing whitespace is left
+        tokens.append(match.group(1) or match.group(2))
+        pos = match.end()
+    return tokens
+
+
+def _parse_block(tokens: List[str], pos: int, closing: bool) -> Tuple[list, int]:
+    statements, current = [], []
+    while pos < len(tokens):
+        token = tokens[pos]; pos += 1
+        if token in (';', '\n'):
+            if current: statements.append(current); current = []
+        elif token == '{':
+            if not current or current[0].lower() != 'repeat': raise MacroError("'{' is only allowed after 'repeat <n>'")
+            body, pos = _parse_block(tokens, pos, closing=True)
+            statements.append(current + [body]); current = []
+        elif token == '}':
+            if not closing: raise MacroError("Unexpected '}'")
+            if current: statements.append(current)
+            return statements, pos
+        else:
+            current.append(token)
+    if closing: raise MacroError("Missing '}'")
+    if current: statements.append(current)
+    return statements, pos
+
+
+def parse(text: str) -> list:
+    """Parse macro text into nested statement lists."""
+    statements, _ = _parse_block(_tokenize(text), 0, closing=False)
+    if not statements: raise MacroError("Macro is empty")
+    return statements
+
+
+# ------------------------------------------------------------------------------
+# Compilation
+# ------------------------------------------------------------------------------
+def _number(value: str, what: str, low: float = -math.inf, high: float = math.inf) -> float:
+    try: number = float(value)
+    except ValueError: raise MacroError(f"Expected a number for {what}, got '{value}'") from None
+    if not math.isfinite(number): raise MacroError(f"Expected a finite number for {what}, got '{value}'")
+    if not low <= number <= high: raise MacroError(f"{what} must be between {low:g} and {high:g}, got {value}")
+    return number
+
+
+def _integer(value: str, what: str, low: float, high: float) -> int:
+    number = _number(value, what, low, high)
+    if number != int(number): raise MacroError(f"Expected a whole number for {what}, got '{value}'")
+    return int(number)
+
+
+def _button(name: str) -> int:
+    try: return BUTTONS[name.upper()]
+    except KeyError: raise MacroError(f"Unknown button '{name}'. Choose from: {', '.join(BUTTONS)}") from None
+
+
+def _side(name: str) -> int:
+    """Index of the x value of a stick/trigger side in State."""
+    side = name.lower()
+    if side not in ('left', 'right'): raise MacroError(f"Expected 'left' or 'right', got '{name}'")
+    return 0 if side == 'left' else 1
+
+
+class _Compiler:
+    def __init__(self):
+        self.state = list(NEUTRAL)
+        self.offset = 0.0
+        self.steps: List[Step] = []
+        self.work = 0  # Statements run plus steps emitted, checked against MAX_STEPS
+
+    def _spend(self, amount: int):
+        self.work += amount
+        if self.work > MAX_STEPS: raise MacroError(f"Macro is too long (more than {MAX_STEPS} steps)")
+
+    def emit(self, phase: str, offset: Optional[float] = None):
+        step = Step(self.offset if offset is None else offset, tuple(self.state), phase)
+        if self.steps and self.steps[-1].offset == step.offset:
+            self.steps[-1] = step  # Changes at the same instant become one report
+        else:
+            self.steps.append(step)
+
+    def compile(self, statements: list):
+        for statement in statements:
+            command, args = statement[0].lower(), statement[1:]
+            handler = getattr(self, f'_cmd_{command}', None)
+            if handler is None: raise MacroError(f"Unknown command '{statement[0]}'")
+            if len(args) > ARITY[command]: raise MacroError(f"Too many arguments for '{command}': {' '.join(map(str, args))}")
+            self._spend(1)
+            handler(PHASES.get(command, command), args)
+
+    def _cmd_turn(self, phase: str, args: list):
+        shape = args[0] if args else 'circle'
+        radius = _number(args[1], 'turn radius', 0.0, 1.0) if len(args) > 1 else 0.8
+        duration = _number(args[2], 'turn duration') if len(args) > 2 else 1.0
+        loops = _integer(args[3], 'turn loops', 1, MAX_STEPS) if len(args) > 3 else 1
+        index = 1 + 2 * _side(args[4] if len(args) > 4 else 'right')
+        if duration <= 0: raise MacroError("turn duration must be positive")
+        try: path = trajectory.get_path(shape, radius)
+        except ValueError as e: raise MacroError(str(e)) from None
+        steps = len(path) - 1
+        self._spend(loops * steps)
+        step_time = duration / steps
+        start = self.offset
+        for loop in range(loops):
+            for i in range(steps):
+                self.state[index:index + 2] = path[i]
+                self.emit(phase, start + (loop * steps + i) * step_time)
+        self.offset = start + loops * duration
+        self.state[index:index + 2] = [0.0, 0.0]; self.emit(phase)  # Recentre the stick as the last loop ends
+
+    def _cmd_stick(self, phase: str, args: list):
+        if len(args) < 3: raise MacroError("stick needs: <left|right> <x> <y> [seconds]")
+        index = 1 + 2 * _side(args[0])
+        self.state[index:index + 2] = [_number(args[1], 'stick x', -1.0, 1.0), _number(args[2], 'stick y', -1.0, 1.0)]
+        self.emit(phase)
+        if len(args) > 3: self.offset += _number(args[3], 'stick seconds', 0.0)
+
+    def _cmd_trigger(self, phase: str, args: list):
+        if len(args) < 2: raise MacroError("trigger needs: <left|right> <value> [seconds]")
+        self.state[5 + _side(args[0])] = _number(args[1], 'trigger value', 0.0, 1.0)
+        self.emit(phase)
+        if len(args) > 2: self.offset += _number(args[2], 'trigger seconds', 0.0)
+
+    def _cmd_press(self, phase: str, args: list):
+        if not args: raise MacroError("press needs a button")
+        self.state[0] |= _button(args[0]); self.emit(phase)
+
+    def _cmd_release(self, phase: str, args: list):
+        if not args: raise MacroError("release needs a button")
+        self.state[0] &= ~_button(args[0]); self.emit(phase)
+
+    def _cmd_tap(self, phase: str, args: list):
+        if not args: raise MacroError("tap needs a button")
+        self._cmd_press(phase, args[:1])
+        self.offset += _number(args[1], 'tap seconds', 0.0) if len(args) > 1 else 0.1
+        self._cmd_release(phase, args[:1])
+
+    def _cmd_hold(self, phase: str, args: list):
+        if len(args) < 2: raise MacroError("hold needs: <button> <seconds>")
+        self._cmd_tap(phase, args)
+
+    def _cmd_wait(self, phase: str, args: list):
+        if not args: raise MacroError("wait needs a number of seconds")
+        self.offset += _number(args[0], 'wait seconds', 0.0)
+
+    def _cmd_neutral(self, phase: str, args: list):
+        self.state = list(NEUTRAL); self.emit(phase)
+
+    def _cmd_repeat(self, phase: str, args: list):
+        if len(args) != 2 or not isinstance(args[1], list): raise MacroError("repeat needs: <n> { ... }")
+        for _ in range(_integer(args[0], 'repeat count', 0, MAX_STEPS)): self.compile(args[1])
+
+
+@lru_cache(maxsize=32)
+def compile_macro(text: str) -> Timeline:
+    """Compile macro ``text`` into a timeline; cached, so unchanged macros compile once."""
+    compiler = _Compiler()
+    compiler.compile(parse(text))
+    if tuple(compiler.state) != NEUTRAL: compiler._cmd_neutral('neutral', [])  # Never leave inputs held
+    return Timeline(tuple(compiler.steps), compiler.offset)
+
+
+# ------------------------------------------------------------------------------
+# Playback
+# ------------------------------------------------------------------------------
+def play(timeline: Timeline, apply: Callable[[State, float], None], cancel: Optional[threading.Event] = None,
+         clock: Callable[[], float] = time.monotonic,
+         on_phase: Optional[Callable[[str, float], None]] = None) -> bool:
+    """Call ``apply(state, due)`` for each step at ``due = start + offset``; returns False if ``cancel`` was set.
+
+    ``on_phase(name, seconds)`` reports the time from the first to the last step
+    of each run of same-phase steps.
+    """
+    steps = timeline.steps
+    start = phase_start = clock()
+    for i, step in enumerate(steps):
+        remaining = start + step.offset - clock()
+        if remaining > 0:
+            if cancel: cancel.wait(remaining)
+            else: time.sleep(remaining)
+        if cancel and cancel.is_set(): return False
+        if i == 0 or steps[i - 1].phase != step.phase: phase_start = clock()
+        apply(step.state, start + step.offset)
+        if on_phase and (i + 1 == len(steps) or steps[i + 1].phase != step.phase):
+            on_phase(step.phase, clock() - phase_start)
+    remaining = start + timeline.duration - clock()
+    if remaining > 0:
+        if cancel: cancel.wait(remaining)
+        else: time.sleep(remaining)
+    return not (cancel and cancel.is_set())
@@ -0,0 +1,139 @@
+# metrics.py - Fixed-memory latency histograms and metrics export.
+# Hot-path phases are timed into preallocated histogram buckets and exported
+# as a JSON snapshot and a Prometheus text file for fleet monitoring.
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bucket bounds in seconds, 0.5 ms to 10 s; anything slower lands in +Inf
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Per-bucket counts plus count/sum/min/max in preallocated storage."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min: self.min = value
+        if value > self.max: self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate quantile ``q`` as the upper bound of the bucket that contains it."""
+        if not self.count: return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank: return bound
+        return self.max
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            'count': self.count, 'sum': round(self.total, 6),
+            'min': round(self.min, 6) if self.count else None, 'max': round(self.max, 6) if self.count else None,
+            'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99),
+            'buckets': dict(zip(map(str, self.bounds + ('+Inf',)), self.counts)),
+        }
+
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+
+class Metrics:
+    """Named (optionally labelled) histograms and gauges, safe to update from any thread."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.clock = clock
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[Key, Histogram] = {}
+        self._counters: Dict[Key, float] = {}
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None: histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock: self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock: self._counters[_key(name, labels)] = value
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Time the enclosed block into histogram ``name``."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self.clock() - start, **labels)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock: return self._histograms.get(_key(name, labels))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {'timestamp': time.time(),
+                    'histograms': {name + _label_text(labels): h.snapshot() for (name, labels), h in sorted(self._histograms.items())},
+                    'counters': {name + _label_text(labels): v for (name, labels), v in sorted(self._counters.items())}}
+
+    # --------------------------------------------------------------------------
+    # Export
+    # --------------------------------------------------------------------------
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = 'antiafk') -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            typed = set()
+            for (name, labels), h in sorted(self._histograms.items()):
+                metric = f"{prefix}_{name}_seconds"
+                if metric not in typed: lines.append(f"# TYPE {metric} histogram"); typed.add(metric)
+                cumulative = 0
+                for bound, count in zip(h.bounds, h.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_label_text(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{metric}_sum{_label_text(labels)} {h.total:.6f}")
+                lines.append(f"{metric}_count{_label_text(labels)} {h.count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f"{prefix}_{name}"
+                if metric not in typed: lines.append(f"# TYPE {metric} gauge"); typed.add(metric)
+                lines.append(f"{metric}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str, basename: str = 'metrics'):
+        """Write ``<basename>.json`` and ``<basename>.prom`` into ``directory`` atomically."""
+        os.makedirs(directory, exist_ok=True)
+        for ext, text in (('json', self.to_json()), ('prom', self.to_prometheus())):
+            path = os.path.join(directory, f"{basename}.{ext}")
+            with open(path + '.tmp', 'w') as f: f.write(text)
+            os.replace(path + '.tmp', path)
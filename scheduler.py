@@ -0,0 +1,140 @@
+# scheduler.py - Event-driven deadline scheduler for the Anti-AFK tool.
+# Keeps a heap of monotonic deadlines and sleeps on a condition variable until
+# the earliest one is due, so an idle instance never wakes up on its own.
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class DeadlineScheduler:
+    """Fires keyed deadlines from a single worker thread.
+
+    Each key has at most one pending deadline; scheduling a key again replaces
+    its previous deadline. Due keys are handed to ``callback`` as a list, in
+    deadline order. Once one key is due, any other key due within
+    ``batch_window`` seconds is pulled forward into the same batch. The clock
+    is injectable so the scheduler can be driven deterministically through
+    ``run_pending`` without starting the worker.
+    """
+
+    def __init__(self, callback: Callable[[List[Hashable]], None],
+                 clock: Callable[[], float] = time.monotonic, batch_window: float = 0.0):
+        self.callback = callback
+        self.clock = clock
+        self.batch_window = batch_window
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # --------------------------------------------------------------------------
+    # Deadline Management
+    # --------------------------------------------------------------------------
+    def schedule(self, key: Hashable, deadline: float):
+        """Set (or replace) the deadline for ``key`` and wake the worker."""
+        with self._cond:
+            seq = next(self._seq)
+            self._entries[key] = (deadline, seq)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            self._cond.notify()
+
+    def schedule_in(self, key: Hashable, delay: float):
+        """Schedule ``key`` to fire ``delay`` seconds from now."""
+        self.schedule(key, self.clock() + delay)
+
+    def cancel(self, key: Hashable):
+        """Drop the pending deadline for ``key``, if any."""
+        with self._cond:
+            if self._entries.pop(key, None) is not None:
+                self._cond.notify()
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """Return the pending deadline for ``key`` or None."""
+        with self._cond:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def time_until(self, key: Hashable) -> Optional[float]:
+        """Return the seconds left until ``key`` fires, or None if not pending."""
+        deadline = self.deadline(key)
+        return None if deadline is None else deadline - self.clock()
+
+    def wake(self):
+        """Wake the worker so it re-evaluates the heap immediately."""
+        with self._cond:
+            self._cond.notify()
+
+    # --------------------------------------------------------------------------
+    # Dispatch
+    # --------------------------------------------------------------------------
+    def _pop_due(self, now: float) -> Tuple[List[Hashable], Optional[float]]:
+        """Pop every due key and return them with the delay to the next deadline."""
+        due = []
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            if self._entries.get(key) != (deadline, seq):
+                heapq.heappop(self._heap)  # Stale entry left behind by a reschedule or cancel
+                continue
+            if deadline > now and not (due and deadline <= now + self.batch_window):
+                return due, deadline - now
+            heapq.heappop(self._heap)
+            del self._entries[key]
+            due.append(key)
+        return due, None
+
+    def run_pending(self) -> Optional[float]:
+        """Fire all due keys on the calling thread; return the delay to the next one."""
+        with self._cond:
+            due, delay = self._pop_due(self.clock())
+        if due:
+            self.callback(due)
+            with self._cond:
+                delay = self._next_delay()
+        return delay
+
+    def _next_delay(self) -> Optional[float]:
+        """Return the delay to the earliest live deadline, discarding stale entries."""
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            if self._entries.get(key) == (deadline, seq):
+                return max(0.0, deadline - self.clock())
+            heapq.heappop(self._heap)
+        return None
+
+    # --------------------------------------------------------------------------
+    # Worker Lifecycle
+    # --------------------------------------------------------------------------
+    def start(self):
+        """Start the worker thread."""
+        with self._cond:
+            if self._running: return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread; pending deadlines are kept."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                if not self._running: return
+                due, delay = self._pop_due(self.clock())
+                if not due:
+                    self._cond.wait(delay)  # None sleeps until schedule(), cancel() or stop()
+                    continue
+            try:
+                self.callback(due)
+            except Exception:
+                pass  # A failing action must not take the scheduler down with it
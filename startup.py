@@ -0,0 +1,78 @@
+# startup.py - Lazy module imports and startup stage timing.
+# Heavy optional modules are imported on first use instead of at import time,
+# and each startup stage is timed so cold-start regressions are easy to spot.
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = self.__dict__['_module'] = importlib.import_module(self.__dict__['_name'])
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for module ``name`` that defers the import until it is used."""
+    return LazyModule(name)
+
+
+class StartupTimer:
+    """Records how long each named startup stage took."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.stages: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            with self._lock: self.stages.append((name, (self.clock() - start) * 1000))
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the timer was created."""
+        return (self.clock() - self.origin) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock: return {name: round(ms, 2) for name, ms in self.stages}
+
+    def report(self) -> str:
+        """Human-readable per-stage report."""
+        with self._lock: stages = list(self.stages)
+        width = max((len(name) for name, _ in stages), default=0)
+        lines = [f"  {name:<{width}}  {ms:8.1f} ms" for name, ms in stages]
+        return "\n".join(["Startup stages:"] + lines + [f"  {'total':<{width}}  {self.elapsed_ms():8.1f} ms"])
@@ -0,0 +1,74 @@
+# targets.py - Registry of game windows the tool sends actions to.
+# Each target can override any of the global settings (interval, radius, ...)
+# so one process can drive several clients with different needs.
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+
+@dataclass
+class Target:
+    """A game window plus its per-target setting overrides."""
+    target_id: str
+    hwnd: int
+    title: str
+    proc_name: str
+    settings: Dict[str, Any] = field(default_factory=dict)
+    anchor: float = 0.0  # Monotonic time the current auto countdown started
+    deadline: float = 0.0  # Monotonic time the current auto countdown ends
+
+    def setting(self, key: str, defaults: Mapping[str, Any]) -> Any:
+        """Return the override for ``key`` or the global default."""
+        return self.settings.get(key, defaults[key])
+
+    @property
+    def label(self) -> str:
+        return f"{self.title} - {self.proc_name}"
+
+
+class TargetRegistry:
+    """Thread-safe, insertion-ordered collection of targets."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._targets: Dict[str, Target] = {}
+        self._ids = itertools.count(1)
+
+    def add(self, hwnd: int, title: str, proc_name: str, settings: Optional[Dict[str, Any]] = None) -> Target:
+        """Register a window, or return the existing target for the same hwnd."""
+        with self._lock:
+            for target in self._targets.values():
+                if target.hwnd == hwnd: return target
+            target = Target(str(next(self._ids)), hwnd, title, proc_name, dict(settings or {}))
+            self._targets[target.target_id] = target
+            return target
+
+    def rebind(self, target_id: str, hwnd: int, title: str) -> Optional[Target]:
+        """Point a target at a new window (e.g. the relaunched game), keeping its id and settings."""
+        with self._lock:
+            target = self._targets.get(target_id)
+            if target: target.hwnd, target.title = hwnd, title
+            return target
+
+    def remove(self, target_id: str) -> Optional[Target]:
+        with self._lock: return self._targets.pop(target_id, None)
+
+    def clear(self) -> List[Target]:
+        with self._lock:
+            removed = list(self._targets.values())
+            self._targets.clear()
+            return removed
+
+    def get(self, target_id: str) -> Optional[Target]:
+        with self._lock: return self._targets.get(target_id)
+
+    def all(self) -> List[Target]:
+        with self._lock: return list(self._targets.values())
+
+    def __len__(self) -> int:
+        with self._lock: return len(self._targets)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
@@ -0,0 +1,125 @@
+# test_config_store.py - Debounced atomic saves, hot reload and save retries of ConfigStore.
+
+import os
+import time
+
+import pytest
+
+import config_store
+from config_store import ConfigStore
+
+DEFAULTS = {'Settings': {'interval': 6, 'focus_policy': 'always'}, 'Keybinds': {'toggle': 'f6'}}
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def temp_files(tmp_path):
+    return [name for name in os.listdir(tmp_path) if name.startswith('.options-')]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'options.ini')
+
+
+def test_missing_file_is_created_from_the_defaults(path):
+    store = ConfigStore(path, DEFAULTS)
+    store.load()
+    assert store.saves == 1
+    reloaded = ConfigStore(path, DEFAULTS)
+    reloaded.load()
+    assert reloaded.snapshot() == DEFAULTS
+
+
+def test_a_burst_of_changes_is_saved_once(path, tmp_path):
+    store = ConfigStore(path, DEFAULTS, save_delay=0.05, poll_interval=60)
+    store.load()
+    store.start()
+    try:
+        for interval in range(10, 20): store.set('Settings', 'interval', interval)
+        wait_for(lambda: store.saves == 2)
+        time.sleep(0.1)
+        assert store.saves == 2  # The initial file, then one save for the whole burst
+    finally:
+        store.stop()
+    reloaded = ConfigStore(path, DEFAULTS)
+    reloaded.load()
+    assert reloaded.get('Settings', 'interval') == 19
+    assert temp_files(tmp_path) == []
+
+
+def test_stop_writes_a_pending_change(path):
+    store = ConfigStore(path, DEFAULTS, save_delay=60, poll_interval=60)
+    store.load()
+    store.start()
+    store.set('Keybinds', 'toggle', 'f7')
+    store.stop()
+    assert 'toggle = f7' in open(path).read()
+
+
+def test_a_failed_write_leaves_the_old_file(path, tmp_path, monkeypatch):
+    store = ConfigStore(path, DEFAULTS)
+    store.load()
+    before = open(path).read()
+
+    def fail(src, dst): raise OSError("disk full")
+    monkeypatch.setattr(config_store.os, 'replace', fail)
+    store.set('Settings', 'interval', 99)
+    with pytest.raises(OSError): store.save_now()
+    assert open(path).read() == before
+    assert temp_files(tmp_path) == []
+
+
+def test_external_edits_are_reported_as_a_diff(path):
+    changes = []
+    store = ConfigStore(path, DEFAULTS, on_change=changes.append)
+    store.load()
+    assert store.check_for_changes() == {}
+    with open(path, 'w') as f:
+        f.write("[Settings]\ninterval = 120\nfocus_policy = always\n\n[Target:game.exe]\ninterval = 30\n")
+    expected = {'Settings': {'interval': 120}, 'Target:game.exe': {'interval': 30}}  # Keybinds falls back to defaults
+    assert store.check_for_changes() == expected
+    assert changes == [expected] and store.reloads == 1
+    assert store.get('Settings', 'interval') == 120 and store.section('Target:game.exe') == {'interval': 30}
+    assert store.check_for_changes() == {}
+
+
+def test_the_worker_picks_up_external_edits(path):
+    changes = []
+    store = ConfigStore(path, DEFAULTS, poll_interval=0.02, on_change=changes.append)
+    store.load()
+    store.start()
+    try:
+        with open(path, 'a') as f: f.write("\n[Target:game.exe]\ncircle_loops = 2\ninterval = 45\n")
+        wait_for(lambda: changes)
+    finally:
+        store.stop()
+    assert changes == [{'Target:game.exe': {'interval': 45}}]
+
+
+def test_a_failing_save_is_retried_after_the_retry_delay(path, monkeypatch):
+    errors, attempts = [], []
+    store = ConfigStore(path, DEFAULTS, save_delay=0.01, poll_interval=60, on_error=errors.append, retry_delay=0.2)
+    store.load()
+
+    def fail():
+        attempts.append(time.monotonic())
+        raise OSError("read-only file system")
+    monkeypatch.setattr(store, 'save_now', fail)
+    store.start()
+    try:
+        store.set('Settings', 'interval', 30)
+        wait_for(lambda: len(attempts) >= 2)
+        time.sleep(0.05)
+    finally:
+        monkeypatch.undo()
+        store.stop()
+    assert len(attempts) == 2  # No busy loop between the attempts
+    assert attempts[1] - attempts[0] >= 0.15
+    assert len(errors) == 2 and isinstance(errors[0], OSError)
+    assert 'interval = 30' in open(path).read()  # stop() still wrote the change
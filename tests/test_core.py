@@ -0,0 +1,116 @@
+# test_core.py - AntiAfkCore settings validation and auto-mode bookkeeping on fake backends.
+
+import pytest
+
+from core import AntiAfkCore
+from gamepad import FakeGamepad
+from hotkeys import FakeHotkeyBackend
+from idle import FakeIdleSource
+from window import FakeWindowBackend
+
+GAME = 7
+
+
+def make_core(clock, tmp_path, options: str = ''):
+    config = tmp_path / 'options.ini'
+    if options: config.write_text(options)
+    windows = FakeWindowBackend(clock=clock)
+    windows.add_window(GAME, 'Game', 'game.exe')
+    core = AntiAfkCore(windows=windows, config_path=str(config), hotkey_backend=FakeHotkeyBackend(),
+                       idle=FakeIdleSource(clock))
+    core.scheduler.clock = clock
+    return core
+
+
+def test_invalid_values_in_options_ini_are_dropped_at_load(clock, tmp_path):
+    core = make_core(clock, tmp_path, "[Settings]\ninterval = 0\ncircle_loops = 3\n\n"
+                                      "[Target:game.exe]\ninterval = 0\nfocus_policy = bogus\ncircle_radius = 7\n"
+                                      "camera_shape = square\naction_duration = 0.5\n")
+    assert core.settings['interval'] == 6 and core.settings['circle_loops'] == 3
+    assert core.target_overrides['game.exe'] == {'action_duration': 0.5}
+    assert core.add_target(GAME).settings == {'action_duration': 0.5}
+
+
+def test_invalid_target_values_are_dropped_on_reload(clock, tmp_path):
+    core = make_core(clock, tmp_path)
+    messages = []
+    core.subscribe(lambda event, data: messages.append(data['message']) if event == 'status' else None)
+    target = core.add_target(GAME)
+    core.store.set_section('Target:game.exe', {'interval': 0, 'camera_shape': 'square', 'circle_loops': 2})
+    core._on_config_changed({'Target:game.exe': {'interval': 0, 'camera_shape': 'square', 'circle_loops': 2}})
+    assert target.settings == {'circle_loops': 2}
+    assert sum('Ignoring options.ini [Target:game.exe]' in m for m in messages) == 2
+
+
+
+def test_minimized_focus_policy_only_focuses_minimized_windows(clock, tmp_path):
+    core = make_core(clock, tmp_path, "[Target:game.exe]\nfocus_policy = probe\n")
+    target = core.add_target(GAME)
+    assert target.settings == {'focus_policy': 'minimized'}
+    assert not core._needs_focus(target)
+    core.windows.windows[GAME]['iconic'] = True
+    assert core._needs_focus(target)
+
+class Devices:
+    """Gamepad factory that counts the devices it creates; ``fail`` makes their reports raise."""
+
+    def __init__(self):
+        self.created, self.fail = [], False
+
+    def __call__(self):
+        devices = self
+
+        class Device(FakeGamepad):
+            def update(self, due=None):
+                if devices.fail: raise OSError("driver error")
+                super().update(due)
+
+        self.created.append(Device())
+        return self.created[-1]
+
+
+@pytest.fixture
+def rig(tmp_path):
+    devices = Devices()
+    windows = FakeWindowBackend()
+    windows.add_window(GAME, 'Game', 'game.exe')
+    core = AntiAfkCore(windows=windows, config_path=str(tmp_path / 'options.ini'), hotkey_backend=FakeHotkeyBackend(),
+                       idle=FakeIdleSource(), gamepad_factory=devices)
+    core._setup_vgamepad()
+    core.settings['action_macro'] = 'tap A 0.01'
+    yield core, devices, core.add_target(GAME)
+    core.pool.close()
+
+
+def test_invalid_action_keeps_the_gamepad(rig):
+    core, devices, target = rig
+    core.perform_game_actions()
+    target.settings['action_macro'] = 'turn circle 0.8 1 1000000000'  # Too long to compile
+    for _ in range(3): core.perform_game_actions()
+    assert len(devices.created) == 1 and core.pool.stats()['leased'] == 1
+
+
+def test_gamepad_error_recreates_the_device(rig):
+    core, devices, target = rig
+    devices.fail = True
+    core.perform_game_actions()
+    devices.fail = False
+    core.perform_game_actions()
+    assert len(devices.created) == 2 and devices.created[-1].reports
+
+
+def test_turning_auto_off_drops_queued_targets(clock, tmp_path):
+    core = make_core(clock, tmp_path)
+    core.settings.update(interval=30, batch_window=0.0)
+    core.windows.add_window(8, 'Game 2', 'game.exe')
+    first, second = core.add_target(GAME), core.add_target(8)
+    core.set_auto(True)
+    core.set_target_setting(second.target_id, 'interval', 60)
+    clock.advance(30); core.scheduler.run_pending()
+    assert core._due_targets == [first.target_id]
+    core.set_auto(False)
+    assert core._due_targets == []
+    core.set_auto(True)
+    core.set_target_setting(first.target_id, 'interval', 100)
+    clock.advance(60); core.scheduler.run_pending()
+    assert core._due_targets == [second.target_id]  # The first target is not due for another 40 s
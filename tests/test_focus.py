@@ -0,0 +1,65 @@
+# test_focus.py - FocusAcquirer polling backoff and settle-time learning on a fake clock.
+
+import pytest
+
+from window import FakeWindowBackend, FocusAcquirer, WindowError
+
+USER, GAME = 1, 2
+
+
+@pytest.fixture
+def backend(clock):
+    backend = FakeWindowBackend(clock=clock)
+    backend.add_window(USER, 'Editor', 'editor.exe')
+    backend.foreground = USER
+    return backend
+
+
+def test_already_focused_returns_at_once(backend, clock):
+    backend.foreground = GAME
+    backend.add_window(GAME, 'Game', 'game.exe')
+    assert FocusAcquirer(backend, clock=clock, sleep=clock.sleep).acquire(GAME, 1.0) == 0.0
+    assert backend.calls.get('set_foreground') is None
+
+
+def test_polls_back_off_up_to_the_maximum(backend, clock):
+    backend.add_window(GAME, 'Game', 'game.exe', focus_delay=0.5)
+    focus = FocusAcquirer(backend, clock=clock, sleep=clock.sleep)
+    elapsed = focus.acquire(GAME, 1.0)
+    assert backend.foreground == GAME and elapsed == pytest.approx(clock.now - 1000.0)
+    assert 0.5 <= elapsed < 0.5 + FocusAcquirer.MAX_POLL
+    assert clock.sleeps[0] == pytest.approx(FocusAcquirer.INITIAL_POLL)
+    assert clock.sleeps[1] == pytest.approx(FocusAcquirer.INITIAL_POLL * FocusAcquirer.BACKOFF)
+    assert all(b >= a for a, b in zip(clock.sleeps, clock.sleeps[1:]))
+    assert max(clock.sleeps) == pytest.approx(FocusAcquirer.MAX_POLL)
+
+
+def test_learned_settle_time_skips_early_polls(backend, clock):
+    backend.add_window(GAME, 'Game', 'game.exe', focus_delay=0.3)
+    focus = FocusAcquirer(backend, clock=clock, sleep=clock.sleep)
+    first = focus.acquire(GAME, 1.0)
+    polls = len(clock.sleeps)
+    backend.foreground, clock.sleeps = USER, []
+    second = focus.acquire(GAME, 1.0)
+    assert clock.sleeps[0] == pytest.approx(first * 0.8)  # Jumps straight to 80% of the learned time
+    assert len(clock.sleeps) < polls
+    assert focus.settle_times[GAME] == pytest.approx(first + FocusAcquirer.SMOOTHING * (second - first))
+
+
+def test_timeout_returns_none_without_oversleeping(backend, clock):
+    backend.add_window(GAME, 'Game', 'game.exe', focus_delay=None)
+    focus = FocusAcquirer(backend, clock=clock, sleep=clock.sleep)
+    assert focus.acquire(GAME, 0.2) is None
+    assert clock.now == pytest.approx(1000.2)
+    assert focus.last_elapsed is None and GAME not in focus.settle_times
+
+
+def test_minimized_window_is_restored_first(backend, clock):
+    backend.add_window(GAME, 'Game', 'game.exe', iconic=True)
+    FocusAcquirer(backend, clock=clock, sleep=clock.sleep).acquire(GAME, 1.0)
+    assert backend.calls['restore'] == 1 and not backend.is_iconic(GAME)
+
+
+def test_missing_window_raises(backend, clock):
+    with pytest.raises(WindowError):
+        FocusAcquirer(backend, clock=clock, sleep=clock.sleep).acquire(99, 1.0)
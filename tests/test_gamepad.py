@@ -0,0 +1,135 @@
+# test_gamepad.py - DevicePool leasing, backoff and reaping, and ReportingGamepad lifecycle.
+
+import threading
+import time
+
+from gamepad import NEUTRAL, DevicePool, FakeGamepad, ReportingGamepad
+
+
+class FlakyFactory:
+    """Device factory that fails ``failures`` times before it starts working."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures: raise OSError("ViGEmBus is not running")
+        return FakeGamepad()
+
+
+def test_lease_creates_once_and_reuses_released_devices(clock):
+    pool = DevicePool(FlakyFactory(), clock=clock)
+    first = pool.lease('a')
+    assert pool.lease('a') is first
+    pool.release('a')
+    assert pool.lease('b') is first
+    assert pool.stats() == dict(created=1, reused=1, failed=0, reaped=0, leased=1, free=0)
+
+
+def test_failed_creation_backs_off_exponentially(clock):
+    factory = FlakyFactory(failures=3)
+    pool = DevicePool(factory, retry_base=1.0, retry_max=3.0, clock=clock)
+    assert pool.lease('a') is None and isinstance(pool.last_error, OSError)
+    for wait in (1.0, 2.0, 3.0):  # 1, 2, then capped at retry_max instead of 4
+        calls = factory.calls
+        clock.advance(wait - 0.001)
+        assert pool.lease('a') is None and factory.calls == calls  # Still backing off: factory not called
+        clock.advance(0.001)
+        device = pool.lease('a')
+    assert device is not None and pool.last_error is None
+    assert pool.stats()['failed'] == 3 and factory.calls == 4
+
+
+def test_reap_closes_idle_devices_only(clock):
+    closed = []
+    pool = DevicePool(FlakyFactory(), idle_timeout=10, close=closed.append, clock=clock)
+    old, recent, spare = pool.lease('old'), pool.lease('recent'), pool.lease('spare')
+    pool.release('spare')
+    clock.advance(5)
+    pool.lease('recent')  # Leasing again counts as use
+    assert pool.next_reap_delay() == 5
+    clock.advance(5)
+    assert pool.reap() == 2
+    assert closed == [old, spare] and pool.devices() == [recent]
+    assert pool.next_reap_delay() == 5
+
+
+def test_discard_and_close_release_devices(clock):
+    closed = []
+    pool = DevicePool(FlakyFactory(), close=closed.append, clock=clock)
+    a, b = pool.lease('a'), pool.lease('b')
+    pool.discard('a')
+    assert closed == [a] and pool.lease('a') is not a
+    pool.close()
+    assert b in closed and pool.devices() == [] and pool.next_reap_delay() is None
+
+
+def test_reporting_gamepad_merges_changes_within_a_tick(clock):
+    device = FakeGamepad(clock=clock)
+    pad = ReportingGamepad(device, rate=100, clock=clock)
+    pad.set_state((1, 0, 0, 0, 0, 0, 0)); pad.update()
+    pad.set_state((1, 0.5, 0, 0, 0, 0, 0)); pad.update()
+    pad.set_state((1, 0.7, 0, 0, 0, 0, 0)); pad.update()
+    pad.update()
+    assert len(device.reports) == 1 and pad.stats() == {'sent': 1, 'skipped': 0, 'merged': 2, 'failed': 0}
+    clock.advance(0.01)
+    pad.flush()
+    assert device.reports[-1][1] == (1, 0.7, 0, 0, 0, 0, 0)
+    pad.close()
+
+
+def test_close_stops_the_flusher_and_drops_the_device():
+    device = FakeGamepad()
+    pad = ReportingGamepad(device, rate=1)
+    pad.set_state((1, 0, 0, 0, 0, 0, 0)); pad.update()
+    pad.set_state(NEUTRAL); pad.press_button(2); pad.update()  # Pending until the next tick
+    flusher = pad._flusher
+    assert flusher is not None and flusher.is_alive()
+    pad.close()
+    assert not flusher.is_alive() and pad.device is None
+    pad.set_state((4, 0, 0, 0, 0, 0, 0)); pad.update(); pad.flush()  # Ignored after close
+    assert len(device.reports) == 1
+    assert flusher not in threading.enumerate()
+
+
+class BrokenGamepad(FakeGamepad):
+    """FakeGamepad whose driver fails the first ``failures`` reports."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def update(self, due=None):
+        if self.failures: self.failures -= 1; raise OSError("driver error")
+        super().update(due)
+
+
+def test_flusher_survives_a_driver_error():
+    device = BrokenGamepad(failures=0)
+    pad = ReportingGamepad(device, rate=100)
+    pad.set_state((1, 0, 0, 0, 0, 0, 0)); pad.update()
+    device.failures = 1
+    pad.set_state((2, 0, 0, 0, 0, 0, 0)); pad.update()  # Pending, sent (and failed) by the flusher
+    deadline = time.monotonic() + 2
+    while pad.stats()['failed'] == 0 and time.monotonic() < deadline: time.sleep(0.005)
+    assert pad.stats()['failed'] == 1 and isinstance(pad.last_error, OSError)
+    for i in range(20):
+        pad.set_state((0, i / 20, 0, 0, 0, 0, 0)); pad.update()
+        time.sleep(0.012)
+    assert len(device.reports) >= 15 and pad.state == device.reports[-1][1]
+    pad.close()
+
+
+def test_report_after_a_failure_sets_every_field():
+    device = BrokenGamepad(failures=0)
+    pad = ReportingGamepad(device, rate=0)
+    pad.set_state((1, 0.5, 0, 0, 0, 0, 0)); pad.update()
+    device.failures = 1
+    pad.set_state((2, 0.5, 0, 0, 0, 0, 0))
+    try: pad.update()
+    except OSError: pass
+    device.reset()  # The driver lost its state, e.g. the controller was re-plugged
+    pad.update()
+    assert device.reports[-1][1] == (2, 0.5, 0, 0, 0, 0, 0)
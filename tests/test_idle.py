@@ -0,0 +1,88 @@
+# test_idle.py - FakeIdleSource and the core's idle gating, driven by a fake clock.
+
+import pytest
+
+from core import AntiAfkCore
+from hotkeys import FakeHotkeyBackend
+from idle import FakeIdleSource
+from window import FakeWindowBackend
+
+GAME = 7
+
+
+def test_fake_idle_source_counts_from_the_last_touch(clock):
+    idle = FakeIdleSource(clock)
+    clock.advance(12)
+    assert idle.idle_seconds() == 12
+    idle.touch()
+    assert idle.idle_seconds() == 0
+    clock.now -= 1  # Never negative, even if the clock is behind the last input
+    assert idle.idle_seconds() == 0
+
+
+@pytest.fixture
+def core(clock, tmp_path):
+    windows = FakeWindowBackend(clock=clock)
+    windows.add_window(GAME, 'Game', 'game.exe')
+    core = AntiAfkCore(windows=windows, config_path=str(tmp_path / 'options.ini'),
+                       hotkey_backend=FakeHotkeyBackend(), idle=FakeIdleSource(clock))
+    core.scheduler.clock = clock
+    core.settings.update(interval=30, batch_window=0.0, idle_gate=True, idle_threshold=60.0)
+    return core
+
+
+def run_action(core):
+    """Perform the queued auto batch's bookkeeping without a gamepad: restart the countdowns."""
+    with core._due_lock: due_ids, core._due_targets = core._due_targets, []
+    for target_id in due_ids: core._schedule_auto(core.targets.get(target_id))
+    return due_ids
+
+
+def fire(core, clock, seconds):
+    clock.advance(seconds)
+    core.scheduler.run_pending()
+    with core._due_lock: return list(core._due_targets)
+
+
+def test_active_user_defers_the_action_until_idle_long_enough(core, clock):
+    core.settings['idle_threshold'] = 100.0
+    target = core.add_target(GAME)
+    core.set_auto(True)
+    core.idle.last_input = clock.now - 50  # Away for 50 s already
+    assert fire(core, clock, 30) == []  # Idle for 80 s, needs 100
+    assert core.scheduler.deadline(('auto', target.target_id)) == pytest.approx(clock.now + 20)
+    assert core.metrics.snapshot()['counters']['idle_deferred{target="game.exe"}'] == 1
+    assert fire(core, clock, 20) == [target.target_id]
+    assert 'idle_forced{target="game.exe"}' not in core.metrics.snapshot()['counters']
+
+
+def test_deferral_is_capped_before_the_afk_threshold(core, clock):
+    target = core.add_target(GAME)
+    core.set_auto(True)
+    clock.advance(20); core.idle.touch()
+    assert fire(core, clock, 10) == []  # Idle for 10 s of 60, but the cap is 50 s after the last action
+    latest = target.anchor + 60 - core.IDLE_GATE_MARGIN
+    assert core.scheduler.deadline(('auto', target.target_id)) == pytest.approx(latest)
+    clock.advance(15); core.idle.touch()
+    assert fire(core, clock, 5) == [target.target_id]  # The user is still busy, but the game needs input
+    assert core.metrics.snapshot()['counters']['idle_forced{target="game.exe"}'] == 1
+
+
+def test_games_keep_getting_input_while_the_user_is_always_active(core, clock):
+    core.settings.update(interval=60, idle_threshold=240.0)
+    core.add_target(GAME)
+    core.set_auto(True)
+    fired_at, last = [], clock.now
+    for _ in range(360):  # One hour with input every 10 s
+        clock.advance(10); core.idle.touch()
+        core.scheduler.run_pending()
+        if run_action(core): fired_at.append(clock.now - last); last = clock.now
+    assert len(fired_at) >= 3600 // 240
+    assert max(fired_at) <= 240 - core.IDLE_GATE_MARGIN
+
+
+def test_targets_without_the_gate_fire_on_time(core, clock):
+    target = core.add_target(GAME)
+    core.set_target_setting(target.target_id, 'idle_gate', False)
+    core.set_auto(True)
+    assert fire(core, clock, 30) == [target.target_id]
@@ -0,0 +1,60 @@
+# test_inputtrace.py - Trace ring file: overwrite protection, wrap-around and reader order.
+
+import pytest
+
+from gamepad import NEUTRAL
+from inputtrace import TraceError, TraceReader, TraceWriter, analyze
+
+
+def state(buttons: int):
+    return (buttons,) + NEUTRAL[1:]
+
+
+def write(path, clock, capacity: int, count: int, start: int = 0):
+    writer = TraceWriter(str(path), capacity=capacity, clock=clock)
+    for i in range(start, start + count):
+        writer.record(1, 7, state(i), due=clock() - 0.001)
+        clock.advance(0.01)
+    writer.close()
+
+
+def read(path):
+    reader = TraceReader(str(path))
+    try: return reader.count, [record.state[0] for record in reader]
+    finally: reader.close()
+
+
+def test_refuses_to_overwrite_a_file_that_is_not_a_trace(tmp_path, clock):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'important notes, not a trace at all\n')
+    with pytest.raises(TraceError, match='Not overwriting'): TraceWriter(str(path), capacity=4, clock=clock)
+    assert path.read_bytes() == b'important notes, not a trace at all\n'
+
+
+def test_an_empty_file_becomes_a_trace(tmp_path, clock):
+    path = tmp_path / 'trace.bin'
+    path.touch()
+    write(path, clock, capacity=4, count=2)
+    assert read(path) == (2, [0, 1])
+
+
+def test_ring_keeps_the_newest_records_oldest_first(tmp_path, clock):
+    path = tmp_path / 'trace.bin'
+    write(path, clock, capacity=4, count=6)
+    assert read(path) == (6, [2, 3, 4, 5])
+    write(path, clock, capacity=4, count=3, start=6)  # Same capacity: continues the ring
+    assert read(path) == (9, [5, 6, 7, 8])
+    write(path, clock, capacity=8, count=1, start=9)  # Other capacity: starts over
+    assert read(path) == (1, [9])
+
+
+def test_analyze_reports_spacing_and_drift(tmp_path, clock):
+    path = tmp_path / 'trace.bin'
+    write(path, clock, capacity=16, count=5)
+    reader = TraceReader(str(path))
+    result = analyze(list(reader))
+    reader.close()
+    assert result['records'] == 5 and result['actions'] == 1
+    action = result['per_action'][0]
+    assert action['spacing']['mean'] == pytest.approx(0.01)
+    assert action['drift']['mean'] == pytest.approx(0.001)
@@ -0,0 +1,106 @@
+# test_ipc.py - Control API requests through ControlServer.handle_line and a loopback socket.
+
+import json
+import socket
+
+import pytest
+
+import ipc
+from core import AntiAfkCore
+from hotkeys import FakeHotkeyBackend
+from idle import FakeIdleSource
+from window import FakeWindowBackend
+
+TOKEN = 'secret-token'
+
+
+@pytest.fixture
+def server(tmp_path):
+    windows = FakeWindowBackend()
+    for hwnd in (1, 2, 3): windows.add_window(hwnd, f'Game {hwnd}', 'game.exe')
+    core = AntiAfkCore(windows=windows, config_path=str(tmp_path / 'options.ini'), hotkey_backend=FakeHotkeyBackend(),
+                       idle=FakeIdleSource())
+    core._setup_vgamepad()
+    server = ipc.ControlServer(core, 0, TOKEN)
+    server.start()
+    yield server
+    server.stop()
+
+
+def call(server, request, token=TOKEN):
+    if token is not None: request = dict(request, token=token)
+    return json.loads(server.handle_line(json.dumps(request)))
+
+
+def test_set_targets_with_a_missing_window_keeps_the_old_targets(server):
+    assert call(server, {'cmd': 'set_targets', 'hwnds': [1, 2]})['ok']
+    reply = call(server, {'cmd': 'set_targets', 'hwnds': [3, 999]})
+    assert not reply['ok'] and '999' in reply['error']
+    assert [t.hwnd for t in server.core.targets.all()] == [1, 2]
+    assert not call(server, {'cmd': 'add_targets', 'hwnds': [3, 999]})['ok']
+    assert len(server.core.targets.all()) == 2
+
+
+def test_settings_batch_with_an_invalid_value_changes_nothing(server):
+    core = server.core
+    reply = call(server, {'cmd': 'settings', 'values': {'interval': 45, 'focus_policy': 'bogus'}})
+    assert not reply['ok'] and core.settings['interval'] != 45
+    assert core.store.get('Settings', 'interval') != 45
+    target_id = call(server, {'cmd': 'add_targets', 'hwnds': [1]})['result'][0]
+    reply = call(server, {'cmd': 'settings', 'values': {'interval': 45, 'circle_radius': 7}, 'targets': [target_id]})
+    assert not reply['ok'] and core.targets.get(target_id).settings == {}
+    assert call(server, {'cmd': 'settings', 'values': {'interval': 45}, 'targets': 'all'})['result'] == {target_id: {'interval': 45}}
+
+
+def test_requests_need_the_token(server):
+    for token in (None, '', 'wrong', TOKEN + 'x'):
+        reply = call(server, {'cmd': 'toggle', 'on': True}, token=token)
+        assert not reply['ok'] and 'token' in reply['error']
+    assert not server.core.toggle
+    reply = json.loads(server.handle_line(json.dumps([{'cmd': 'status', 'token': TOKEN}, {'cmd': 'quit'}])))
+    assert reply[0]['ok'] and not reply[1]['ok']
+    with pytest.raises(ValueError): ipc.ControlServer(server.core, 0, '')
+
+
+def test_http_and_non_json_lines_are_not_answered(server):
+    for line in ('POST / HTTP/1.1', 'GET /status HTTP/1.1', 'OPTIONS * HTTP/1.1', 'not json', '{"cmd": '):
+        assert server.handle_line(line) is None
+
+
+def test_http_request_closes_the_connection(server):
+    with socket.create_connection(server.address, timeout=5) as sock:
+        sock.sendall(b'POST / HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n' + json.dumps({'cmd': 'quit', 'token': TOKEN}).encode() + b'\n')
+        data = b''
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk: break
+            data += chunk
+    assert json.loads(data) == {'ok': False, 'error': 'Invalid JSON, closing the connection.'}
+    assert not server.core.quit_event.is_set()
+
+
+def test_socket_requests_get_one_reply_per_line(server):
+    with socket.create_connection(server.address, timeout=5) as sock:
+        sock.sendall(json.dumps({'cmd': 'status', 'token': TOKEN, 'id': 1}).encode() + b'\n')
+        reply = json.loads(sock.makefile('rb').readline())
+    assert reply['ok'] and reply['id'] == 1
+
+
+def test_path_settings_must_stay_next_to_options_ini(server):
+    for key in ipc.PATH_SETTINGS:
+        before = server.core.settings[key]
+        for path in ('../x', 'logs/../../x', '/etc/x', '\\\\server\\share', 'C:\\x', 'c:x'):
+            reply = call(server, {'cmd': 'settings', 'values': {key: path}})
+            assert not reply['ok'] and 'relative path' in reply['error']
+            assert server.core.settings[key] == before
+        assert call(server, {'cmd': 'settings', 'values': {key: 'logs/out'}})['ok']
+
+
+def test_token_is_not_sent_back(server):
+    assert 'ipc_token' not in call(server, {'cmd': 'status'})['result']['settings']
+    assert 'ipc_token' not in call(server, {'cmd': 'settings', 'values': {'interval': 30}})['result']
+
+
+def test_toggle_needs_a_boolean(server):
+    reply = call(server, {'cmd': 'toggle', 'on': 'false'})
+    assert not reply['ok'] and not server.core.toggle
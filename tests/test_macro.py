@@ -0,0 +1,95 @@
+# test_macro.py - Parsing, validation and compilation of action macros.
+
+import pytest
+
+import macro
+import trajectory
+from gamepad import NEUTRAL
+
+A, B = macro.BUTTONS['A'], macro.BUTTONS['B']
+
+
+def states(timeline):
+    return [(round(step.offset, 6), step.state) for step in timeline.steps]
+
+
+def test_tap_presses_then_releases():
+    timeline = macro.compile_macro("tap A 0.2")
+    assert states(timeline) == [(0.0, (A, 0, 0, 0, 0, 0, 0)), (0.2, NEUTRAL)]
+    assert timeline.duration == pytest.approx(0.2)
+    assert {step.phase for step in timeline.steps} == {'button_press'}
+
+
+def test_changes_at_the_same_offset_become_one_step():
+    timeline = macro.compile_macro("press A; press B; stick left 0.5 -0.5; wait 1; neutral")
+    assert states(timeline) == [(0.0, (A | B, 0.5, -0.5, 0, 0, 0, 0)), (1.0, NEUTRAL)]
+
+
+def test_held_inputs_are_released_at_the_end():
+    timeline = macro.compile_macro("trigger right 1 0.5")
+    assert timeline.steps[-1].state == NEUTRAL and timeline.steps[-1].offset == pytest.approx(0.5)
+
+
+def test_turn_follows_the_trajectory_and_recentres():
+    timeline = macro.compile_macro("turn circle 0.5 1.2 2")
+    path = trajectory.get_path('circle', 0.5)
+    steps = len(path) - 1
+    assert len(timeline.steps) == 2 * steps + 1
+    assert timeline.steps[1].state[3:5] == path[1]  # Right stick by default
+    assert timeline.steps[steps].offset == pytest.approx(1.2)  # The duration is per loop
+    assert timeline.steps[-1].state == NEUTRAL and timeline.duration == pytest.approx(2.4)
+
+
+def test_repeat_and_comments_and_newlines():
+    text = "repeat 3 {\n  tap B 0.1  # short tap\n  wait 0.1\n}"
+    timeline = macro.compile_macro(text)
+    assert [offset for offset, _ in states(timeline)] == [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+    assert timeline.duration == pytest.approx(0.6)
+
+
+def test_offsets_never_go_backwards():
+    timeline = macro.compile_macro("tap A 0; stick left 1 0 0; trigger right 1 0; wait 0; repeat 0 { tap B }")
+    offsets = [step.offset for step in timeline.steps]
+    assert offsets == sorted(offsets) and timeline.duration == 0
+
+
+def test_default_macro_compiles():
+    timeline = macro.compile_macro(macro.default_macro('figure_eight', 0.8, 1.0, 1, 1.0))
+    assert timeline.steps[-1].state == NEUTRAL and timeline.duration == pytest.approx(1.2)
+
+
+def test_compiled_timelines_are_cached():
+    assert macro.compile_macro("tap A") is macro.compile_macro("tap A")
+
+
+@pytest.mark.parametrize('text', [
+    "", "jump", "tap Z", "stick up 0 0", "tap A 0.1 0.2", "wait -1", "wait inf", "repeat 2 tap A",
+    "repeat 2 { tap A", "tap A }", "turn square", "turn circle 0.8 0",
+    "stick left 1.5 0", "stick right 0 -1.01", "trigger left 2", "trigger right -0.1", "turn circle 1.5",
+    "tap A -5", "hold B -0.1", "stick left 0 1 -1", "trigger right 1 -0.5",
+    "turn circle 0.8 1 2.9", "turn circle 0.8 1 0", "repeat 2.9 { tap A }", "repeat -1 { tap A }",
+])
+def test_invalid_macros_raise(text):
+    with pytest.raises(macro.MacroError):
+        macro.compile_macro(text)
+
+
+@pytest.mark.parametrize('text', ["repeat 1e9 { wait 1 }", "turn circle 0.8 1 1000000000",
+                                  "repeat 1000 { repeat 1000 { tap A } }"])
+def test_huge_macros_are_rejected(text):
+    with pytest.raises(macro.MacroError):
+        macro.compile_macro(text)
+
+
+def test_play_applies_steps_at_their_deadlines(clock, monkeypatch):
+    monkeypatch.setattr(macro.time, 'sleep', clock.sleep)
+    applied = []
+    timeline = macro.compile_macro("tap A 0.25; wait 0.5")
+
+    def apply(state, due):
+        applied.append((due - 1000.0, clock.now - 1000.0, state))
+
+    assert macro.play(timeline, apply, clock=clock)
+    assert [(round(due, 6), round(at, 6), s) for due, at, s in applied] == [(0.0, 0.0, (A, 0, 0, 0, 0, 0, 0)),
+                                                                           (0.25, 0.25, NEUTRAL)]
+    assert clock.now == pytest.approx(1000.75)
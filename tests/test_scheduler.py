@@ -0,0 +1,67 @@
+# test_scheduler.py - DeadlineScheduler driven through run_pending on a fake clock.
+
+from scheduler import DeadlineScheduler
+
+
+def make(clock, batch_window=0.0):
+    fired = []
+    return DeadlineScheduler(fired.append, clock=clock, batch_window=batch_window), fired
+
+
+def test_nothing_fires_before_its_deadline(clock):
+    scheduler, fired = make(clock)
+    scheduler.schedule_in('a', 5)
+    assert scheduler.run_pending() == 5
+    clock.advance(4.999)
+    scheduler.run_pending()
+    assert fired == []
+
+
+def test_due_keys_fire_in_deadline_order_as_one_batch(clock):
+    scheduler, fired = make(clock)
+    scheduler.schedule_in('b', 2); scheduler.schedule_in('a', 1); scheduler.schedule_in('c', 10)
+    clock.advance(3)
+    assert scheduler.run_pending() == 7
+    assert fired == [['a', 'b']]
+
+
+def test_batch_window_pulls_close_deadlines_forward(clock):
+    scheduler, fired = make(clock, batch_window=2.0)
+    scheduler.schedule_in('a', 1); scheduler.schedule_in('b', 2.5); scheduler.schedule_in('c', 3.5)
+    clock.advance(1)
+    assert scheduler.run_pending() == 2.5
+    assert fired == [['a', 'b']]  # 'c' is 2.5 s after now, outside the window
+
+
+def test_batch_window_does_not_fire_early_on_its_own(clock):
+    scheduler, fired = make(clock, batch_window=5.0)
+    scheduler.schedule_in('a', 1)
+    scheduler.run_pending()
+    assert fired == []
+
+
+def test_reschedule_replaces_and_cancel_drops_the_deadline(clock):
+    scheduler, fired = make(clock)
+    scheduler.schedule_in('a', 1); scheduler.schedule_in('a', 5); scheduler.schedule_in('b', 2)
+    scheduler.cancel('b')
+    assert scheduler.deadline('b') is None
+    clock.advance(2)
+    assert scheduler.run_pending() == 3  # Stale entries for 'a' and 'b' are skipped
+    clock.advance(3)
+    scheduler.run_pending()
+    assert fired == [['a']]
+    assert scheduler.run_pending() is None
+
+
+def test_callback_can_reschedule(clock):
+    fired = []
+
+    def on_due(due):
+        fired.append(due)
+        scheduler.schedule_in('a', 10)
+
+    scheduler = DeadlineScheduler(on_due, clock=clock)
+    scheduler.schedule_in('a', 1)
+    clock.advance(1)
+    assert scheduler.run_pending() == 10
+    assert fired == [['a']]
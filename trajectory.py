@@ -0,0 +1,48 @@
+# trajectory.py - Precomputed camera trajectories.
+# Stick paths are built once per (shape, radius, steps) and cached; macro.py
+# compiles them into timelines that are played against absolute deadlines.
+
+import math
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+Point = Tuple[float, float]
+Path = Tuple[Point, ...]
+
+DEFAULT_STEPS = 60
+
+
+def _circle(t: float) -> Point:
+    angle = t * 2 * math.pi
+    return math.cos(angle), math.sin(angle)
+
+
+def _figure_eight(t: float) -> Point:
+    angle = t * 2 * math.pi
+    return math.sin(angle), math.sin(2 * angle)
+
+
+def _arc_sweep(t: float) -> Point:
+    # Sweep across the upper half of the stick range and back again
+    angle = math.pi / 4 + (math.pi / 2) * (1 - abs(2 * t - 1))
+    return math.cos(angle), math.sin(angle)
+
+
+SHAPES: Dict[str, Callable[[float], Point]] = {
+    'circle': _circle,
+    'figure_eight': _figure_eight,
+    'arc_sweep': _arc_sweep,
+}
+
+
+@lru_cache(maxsize=32)
+def get_path(shape: str, radius: float, steps: int = DEFAULT_STEPS) -> Path:
+    """Return the closed stick path for one loop of ``shape`` as ``steps + 1`` points."""
+    try:
+        func = SHAPES[shape]
+    except KeyError:
+        raise ValueError(f"Unknown camera shape '{shape}'. Choose from: {', '.join(SHAPES)}") from None
+    if steps <= 0:
+        raise ValueError("Trajectory needs at least one step.")
+    return tuple((x * radius, y * radius) for x, y in (func(i / steps) for i in range(steps + 1)))
+
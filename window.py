@@ -0,0 +1,264 @@
+# window.py - Window management backends and adaptive foreground acquisition.
+# All window calls made by the app go through a WindowBackend, so the Win32
+# implementation can be swapped for a fake window manager off Windows.
+
+import fnmatch
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Collection, Dict, Hashable, List, Optional, Tuple
+
+
+# How a target is activated before its action: 'always' brings it to the
+# foreground, 'never' sends input in the background, and 'minimized' only
+# focuses windows the backend says cannot take background input (on Win32,
+# minimized ones). 'probe' is the old name of 'minimized'.
+FOCUS_POLICIES = ('always', 'never', 'minimized')
+FOCUS_POLICY_ALIASES = {'probe': 'minimized'}
+
+
+class WindowError(Exception):
+    """Raised by a backend when a window operation fails."""
+
+
+class WindowBackend:
+    """Interface for the window operations the app needs."""
+
+    def is_window(self, hwnd: int) -> bool: raise NotImplementedError
+    def is_iconic(self, hwnd: int) -> bool: raise NotImplementedError
+    def restore(self, hwnd: int): raise NotImplementedError
+    def set_foreground(self, hwnd: int): raise NotImplementedError
+    def get_foreground(self) -> int: raise NotImplementedError
+    def get_window_text(self, hwnd: int) -> str: raise NotImplementedError
+    def get_process_name(self, hwnd: int) -> str: raise NotImplementedError
+    def get_cursor_pos(self) -> Tuple[int, int]: raise NotImplementedError
+    def set_cursor_pos(self, pos: Tuple[int, int]): raise NotImplementedError
+    def list_windows(self) -> List[int]: raise NotImplementedError
+
+    def accepts_background_input(self, hwnd: int) -> bool:
+        """Used by the 'minimized' focus policy.
+
+        Windows gives no way to ask whether a game reads controller input in
+        the background, so this only checks that the window is not minimized
+        (minimized games usually stop reading input). Backends that can tell
+        better may override it.
+        """
+        return not self.is_iconic(hwnd)
+
+
+class Win32WindowBackend(WindowBackend):
+    """WindowBackend on top of pywin32.
+
+    Process names are cached per (pid, process creation time) (LRU,
+    ``process_cache_size`` entries), so repeated lookups skip
+    GetModuleFileNameEx and a reused pid never returns a stale name.
+    """
+
+    def __init__(self, process_cache_size: int = 64):
+        import win32api, win32con, win32gui, win32process
+        self.win32api, self.win32con, self.win32gui, self.win32process = win32api, win32con, win32gui, win32process
+        self._errors = (win32gui.error, win32api.error)
+        self.process_cache_size = process_cache_size
+        self._process_names: "OrderedDict[Tuple[int, Any], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = self.cache_misses = 0
+
+    def _call(self, func, *args):
+        try: return func(*args)
+        except self._errors as e: raise WindowError(str(e)) from e
+
+    def is_window(self, hwnd: int) -> bool: return bool(self.win32gui.IsWindow(hwnd))
+    def is_iconic(self, hwnd: int) -> bool: return bool(self._call(self.win32gui.IsIconic, hwnd))
+    def restore(self, hwnd: int): self._call(self.win32gui.ShowWindow, hwnd, self.win32con.SW_RESTORE)
+    def set_foreground(self, hwnd: int): self._call(self.win32gui.SetForegroundWindow, hwnd)
+    def get_foreground(self) -> int: return self.win32gui.GetForegroundWindow()
+    def get_window_text(self, hwnd: int) -> str: return self._call(self.win32gui.GetWindowText, hwnd)
+    def get_cursor_pos(self) -> Tuple[int, int]: return self._call(self.win32gui.GetCursorPos)
+    def set_cursor_pos(self, pos: Tuple[int, int]): self._call(self.win32api.SetCursorPos, pos)
+
+    def list_windows(self) -> List[int]:
+        """Handles of all visible top-level windows."""
+        hwnds: List[int] = []
+        is_visible = self.win32gui.IsWindowVisible
+        self._call(self.win32gui.EnumWindows, lambda hwnd, _: hwnds.append(hwnd) if is_visible(hwnd) else None, None)
+        return hwnds
+
+    def get_process_name(self, hwnd: int) -> str:
+        _, pid = self._call(self.win32process.GetWindowThreadProcessId, hwnd)
+        access = self.win32con.PROCESS_QUERY_INFORMATION | self.win32con.PROCESS_VM_READ
+        handle = self._call(self.win32api.OpenProcess, access, False, pid)
+        try:
+            key = (pid, self._call(self.win32process.GetProcessTimes, handle)['CreationTime'])
+            with self._cache_lock:
+                name = self._process_names.get(key)
+                if name is not None:
+                    self._process_names.move_to_end(key); self.cache_hits += 1
+                    return name
+                self.cache_misses += 1
+            name = os.path.basename(self._call(self.win32process.GetModuleFileNameEx, handle, 0))
+        finally:
+            self.win32api.CloseHandle(handle)
+        with self._cache_lock:
+            self._process_names[key] = name
+            while len(self._process_names) > self.process_cache_size: self._process_names.popitem(last=False)
+        return name
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory window manager for tests and benchmarks.
+
+    ``focus_delay`` is how long (on ``clock``) a window takes to actually reach
+    the foreground after ``set_foreground``; None means it never does.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.windows: Dict[int, dict] = {}
+        self.foreground = 0
+        self.cursor = (0, 0)
+        self._pending: Optional[Tuple[int, float]] = None
+        self.calls: Dict[str, int] = {}
+
+    def add_window(self, hwnd: int, title: str = "", proc_name: str = "", focus_delay: Optional[float] = 0.0,
+                   iconic: bool = False, background_input: bool = True):
+        self.windows[hwnd] = {'title': title, 'proc_name': proc_name, 'focus_delay': focus_delay, 'iconic': iconic,
+                              'background_input': background_input}
+
+    def close_window(self, hwnd: int):
+        self.windows.pop(hwnd, None)
+        if self.foreground == hwnd: self.foreground = 0
+
+    def _count(self, name: str): self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _get(self, hwnd: int) -> dict:
+        if hwnd not in self.windows: raise WindowError(f"Invalid window handle {hwnd}")
+        return self.windows[hwnd]
+
+    def is_window(self, hwnd: int) -> bool: return hwnd in self.windows
+    def is_iconic(self, hwnd: int) -> bool: return self._get(hwnd)['iconic']
+    def restore(self, hwnd: int): self._count('restore'); self._get(hwnd)['iconic'] = False
+    def get_window_text(self, hwnd: int) -> str: return self._get(hwnd)['title']
+    def get_process_name(self, hwnd: int) -> str: return self._get(hwnd)['proc_name']
+    def get_cursor_pos(self) -> Tuple[int, int]: return self.cursor
+    def list_windows(self) -> List[int]: self._count('list_windows'); return list(self.windows)
+    def accepts_background_input(self, hwnd: int) -> bool:
+        window = self._get(hwnd)
+        return window['background_input'] and not window['iconic']
+    def set_cursor_pos(self, pos: Tuple[int, int]): self._count('set_cursor_pos'); self.cursor = tuple(pos)
+
+    def set_foreground(self, hwnd: int):
+        self._count('set_foreground')
+        delay = self._get(hwnd)['focus_delay']
+        if delay == 0: self.foreground, self._pending = hwnd, None
+        elif delay is not None: self._pending = (hwnd, self.clock() + delay)
+
+    def get_foreground(self) -> int:
+        if self._pending and self.clock() >= self._pending[1]:
+            self.foreground, self._pending = self._pending[0], None
+        return self.foreground
+
+
+class FocusAcquirer:
+    """Brings a window to the foreground by polling with backoff until it arrives.
+
+    A per-key moving average of the settle time lets later acquisitions skip
+    the polls that would almost certainly come back negative.
+    """
+
+    INITIAL_POLL = 0.002
+    MAX_POLL = 0.05
+    BACKOFF = 1.5
+    SMOOTHING = 0.3
+
+    def __init__(self, backend: WindowBackend, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.backend = backend
+        self.clock = clock
+        self.sleep = sleep
+        self.settle_times: Dict[Hashable, float] = {}
+        self.last_elapsed: Optional[float] = None
+
+    def acquire(self, hwnd: int, timeout: float, key: Optional[Hashable] = None) -> Optional[float]:
+        """Focus ``hwnd`` and return the seconds it took, or None on timeout.
+
+        Raises WindowError if the backend refuses the activation outright.
+        """
+        key = hwnd if key is None else key
+        backend, start = self.backend, self.clock()
+        if backend.get_foreground() == hwnd:
+            self.last_elapsed = 0.0
+            return 0.0
+        if backend.is_iconic(hwnd): backend.restore(hwnd)
+        backend.set_foreground(hwnd)
+        deadline = start + timeout
+        learned = self.settle_times.get(key)
+        if learned: self._sleep_until(min(start + learned * 0.8, deadline))
+        poll = self.INITIAL_POLL
+        while backend.get_foreground() != hwnd:
+            now = self.clock()
+            if now >= deadline:
+                self.last_elapsed = None
+                return None
+            self._sleep_until(min(now + poll, deadline))
+            poll = min(poll * self.BACKOFF, self.MAX_POLL)
+        elapsed = self.clock() - start
+        self.settle_times[key] = elapsed if learned is None else learned + self.SMOOTHING * (elapsed - learned)
+        self.last_elapsed = elapsed
+        return elapsed
+
+    def _sleep_until(self, deadline: float):
+        remaining = deadline - self.clock()
+        if remaining > 0: self.sleep(remaining)
+
+
+class WindowIndex:
+    """Windows grouped by process name, kept current by diffing the window list.
+
+    ``refresh`` only queries the title and process of windows that appeared
+    since the last call, so it is cheap enough to run every few seconds, and
+    ``find`` is a dictionary lookup instead of a full window scan.
+    """
+
+    def __init__(self, backend: WindowBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._procs: Dict[int, str] = {}  # hwnd -> process name
+        self._by_proc: Dict[str, Dict[int, None]] = {}  # process name -> hwnds, oldest first
+        self.refreshes = 0
+
+    def refresh(self) -> Tuple[int, int]:
+        """Pick up created and destroyed windows; returns (added, removed)."""
+        try: current = set(self.backend.list_windows())
+        except WindowError: return 0, 0
+        with self._lock: known = set(self._procs)
+        added, removed = current - known, known - current
+        names = {}
+        for hwnd in added:
+            try: names[hwnd] = self.backend.get_process_name(hwnd)
+            except WindowError: pass  # Closed again already, or a process we may not open
+        with self._lock:
+            for hwnd in removed:
+                proc = self._procs.pop(hwnd)
+                windows = self._by_proc.get(proc)
+                if windows is not None:
+                    windows.pop(hwnd, None)
+                    if not windows: del self._by_proc[proc]
+            for hwnd, proc in names.items():
+                self._procs[hwnd] = proc
+                self._by_proc.setdefault(proc, {})[hwnd] = None
+            self.refreshes += 1
+        return len(names), len(removed)
+
+    def find(self, proc_name: str, title_pattern: str, exclude: Collection[int] = ()) -> Optional[int]:
+        """Newest live window of ``proc_name`` whose title matches ``title_pattern`` (a glob, case-insensitive)."""
+        with self._lock: candidates = list(self._by_proc.get(proc_name, ()))
+        for hwnd in reversed(candidates):
+            if hwnd in exclude: continue
+            try: title = self.backend.get_window_text(hwnd)
+            except WindowError: continue
+            if fnmatch.fnmatch(title.lower(), title_pattern.lower()): return hwnd
+        return None
+
+    def windows(self, proc_name: str) -> List[int]:
+        with self._lock: return list(self._by_proc.get(proc_name, ()))